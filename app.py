@@ -5,21 +5,42 @@ Sistema completo: Juego + Cartillas + PDF + PNG + Auto-verificación
 Fixed & Enhanced by Claude — v4.0
 """
 
-import asyncio, json, os, random, socket, tempfile, threading, time, uuid
+import asyncio, bisect, concurrent.futures, gzip, hashlib, itertools, json, multiprocessing, os, random, re, socket, sqlite3, tempfile, threading, time, uuid, zipfile
+from collections import OrderedDict, deque
+from contextlib import contextmanager
 from datetime import datetime
 from io import BytesIO
 from pathlib import Path
+from urllib.parse import urlencode
 
 import edge_tts
-from flask import Flask, jsonify, render_template, request, send_file, session, redirect
+from flask import Flask, Response, jsonify, render_template, request, send_file, session, redirect
 from num2words import num2words
 
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import cm
+from reportlab.lib.utils import ImageReader
 from reportlab.pdfgen import canvas as rl_canvas
 from PIL import Image, ImageDraw, ImageFont
 import qrcode
 
+try:
+    import numpy as np          # optional: vectorized bulk checking
+except ImportError:
+    np = None
+try:
+    import orjson               # optional: faster encoding of the big JSON lists
+except ImportError:
+    orjson = None
+try:
+    import brotli               # optional: Content-Encoding: br for the big JSON lists
+except ImportError:
+    brotli = None
+try:
+    import fcntl                # POSIX only: one process at a time owns the game journal
+except ImportError:
+    fcntl = None
+
 app = Flask(__name__)
 
 # ─── Seguridad ────────────────────────────────────────────────────────────────
@@ -50,31 +71,260 @@ TTS_DIR       = Path(tempfile.gettempdir()) / "bingo_web_tts"
 CARTILLAS_DIR.mkdir(exist_ok=True)
 TTS_DIR.mkdir(exist_ok=True)
 
-# ─── Vouchers ────────────────────────────────────────────────────────────────
-VOUCHERS_FILE = CARTILLAS_DIR / "_vouchers.json"
-vouchers_lock = threading.Lock()
+# Render-pool workers are spawned and import this module again. They only need
+# the renderers, so the stores, game journal and caches below are not opened
+# (None) in them. RenderPool marks its workers by putting its own pid in
+# RENDER_PARENT_ENV, which they inherit; any other process hosting the app
+# starts normally. (multiprocessing.parent_process() cannot tell: it is not
+# set yet while a spawned child re-runs the main script.)
+RENDER_PARENT_ENV = "BINGO_RENDER_PARENT"
+RENDER_WORKER = os.environ.get(RENDER_PARENT_ENV) == str(os.getppid())
+
+# ─── Almacenamiento ───────────────────────────────────────────────────────────
+# BINGO_STORAGE=json   (default) one file per cartilla + _vouchers.json, one process
+# BINGO_STORAGE=sqlite a single SQLite database in WAL mode, safe for gunicorn -w N.
+# The first sqlite start imports the existing JSON data once (migrate_json_storage).
+STORAGE = os.environ.get("BINGO_STORAGE", "json").strip().lower()
+DB_PATH = Path(os.environ.get("BINGO_DB", str(CARTILLAS_DIR / "bingo.sqlite3")))
+
+_DB_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cartillas (
+    seq          INTEGER PRIMARY KEY AUTOINCREMENT,
+    id           TEXT NOT NULL UNIQUE,
+    voucher_code TEXT NOT NULL DEFAULT '',
+    created      TEXT NOT NULL DEFAULT '',
+    fingerprint  TEXT NOT NULL UNIQUE,
+    data         TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS cartillas_voucher ON cartillas (voucher_code);
+CREATE INDEX IF NOT EXISTS cartillas_created ON cartillas (created);
+CREATE TABLE IF NOT EXISTS vouchers (
+    code    TEXT PRIMARY KEY,
+    created TEXT NOT NULL DEFAULT '',
+    used    INTEGER NOT NULL DEFAULT 0,
+    data    TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS vouchers_created ON vouchers (created);
+CREATE TABLE IF NOT EXISTS game (
+    id      INTEGER PRIMARY KEY CHECK (id = 1),
+    version INTEGER NOT NULL,
+    data    TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+def open_db(path: Path = DB_PATH) -> sqlite3.Connection:
+    """New autocommit connection in WAL mode with the schema in place.
 
-def _load_vouchers() -> list:
-    if not VOUCHERS_FILE.exists():
-        return []
+    One connection per store (guarded by the store's lock); use
+    db_transaction() for anything that must be atomic.
+    """
+    conn = sqlite3.connect(str(path), timeout=10, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=10000")
+    conn.executescript(_DB_SCHEMA)
+    return conn
+
+@contextmanager
+def db_transaction(conn: sqlite3.Connection):
+    """BEGIN IMMEDIATE ... COMMIT (ROLLBACK on error): takes the write lock up front."""
+    conn.execute("BEGIN IMMEDIATE")
     try:
-        return json.loads(VOUCHERS_FILE.read_text(encoding="utf-8"))
-    except:
-        return []
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
 
-def _save_vouchers(vs: list) -> None:
-    VOUCHERS_FILE.write_text(json.dumps(vs, ensure_ascii=False, indent=2), encoding="utf-8")
+# ─── Vouchers ────────────────────────────────────────────────────────────────
+VOUCHERS_FILE = CARTILLAS_DIR / "_vouchers.json"
 
 def _gen_voucher_code() -> str:
     alphabet = "ABCDEFGHJKLMNPQRSTUVWXYZ23456789"
     return "".join(random.choice(alphabet) for _ in range(6))
 
-def _find_voucher(vs: list, code: str):
-    code = (code or "").strip().upper()
-    for v in vs:
-        if v.get("code", "").upper() == code:
+def _new_voucher(code: str, fields: dict) -> dict:
+    return {
+        "code":      code,
+        "numero":    fields.get("numero", ""),
+        "nombres":   fields.get("nombres", ""),
+        "apellidos": fields.get("apellidos", ""),
+        "created":   datetime.now().isoformat(),
+        "used":      False,
+    }
+
+class JsonVoucherStore:
+    """Vouchers kept in a dict keyed by code, persisted as snapshot + journal.
+
+    `_vouchers.json` is the snapshot (a JSON list, newest first — the old
+    format); every change since is one appended line in `_vouchers.journal`
+    ({"op": "put", "v": {...}} or {"op": "del", "code": ...}). Lookups are
+    O(1) and a write appends one record; once the journal outgrows the
+    snapshot it is folded into a new snapshot (written atomically, then the
+    journal is truncated — replaying it twice is harmless). Single process.
+    """
+
+    COMPACT_MIN = 1000           # journal records before compaction is considered
+
+    def __init__(self, path: Path):
+        self.path     = path
+        self.journal  = path.with_suffix(".journal")
+        self._lock    = threading.Lock()
+        self._by_code = {}       # code -> voucher, oldest first
+        self._records = 0        # lines in the journal
+        self.version  = 0        # bumped on every change
+        self._load()
+
+    def _load(self) -> None:
+        vs = []
+        if self.path.exists():
+            try:
+                vs = json.loads(self.path.read_text(encoding="utf-8"))
+            except:
+                vs = []
+        for v in reversed(vs):
+            self._by_code[v.get("code", "").upper()] = v
+        torn = False
+        if self.journal.exists():
+            for line in self.journal.read_text(encoding="utf-8").splitlines():
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    torn = True  # half-written last line after a crash
+                    continue
+                self._apply(rec)
+                self._records += 1
+        if torn:
+            self._compact()      # so new records do not get glued to the torn one
+
+    def _apply(self, rec: dict) -> None:
+        if rec["op"] == "put":
+            self._by_code[rec["v"]["code"].upper()] = rec["v"]
+        else:
+            self._by_code.pop(rec["code"], None)
+
+    def _append(self, rec: dict) -> None:
+        with open(self.journal, "a", encoding="utf-8") as f:
+            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        self._apply(rec)
+        self._records += 1
+        self.version  += 1
+        if self._records >= self.COMPACT_MIN and self._records > len(self._by_code):
+            self._compact()
+
+    def _compact(self) -> None:
+        tmp = self.path.with_name(f".{self.path.name}.tmp")
+        tmp.write_text(json.dumps(self._newest_first(), ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(tmp, self.path)
+        open(self.journal, "w").close()
+        self._records = 0
+
+    def _newest_first(self) -> list:
+        return list(reversed(self._by_code.values()))
+
+    def get(self, code: str):
+        with self._lock:
+            v = self._by_code.get(code)
+            return dict(v) if v else None
+
+    def list(self) -> list:
+        """Newest first. The dicts are the stored ones — do not mutate them."""
+        with self._lock:
+            return self._newest_first()
+
+    def create(self, fields: dict) -> dict:
+        with self._lock:
+            code = _gen_voucher_code()
+            while code in self._by_code:
+                code = _gen_voucher_code()
+            v = _new_voucher(code, fields)
+            self._append({"op": "put", "v": v})
             return v
-    return None
+
+    def mark_used(self, code: str, cartilla_ids: list) -> bool:
+        with self._lock:
+            v = self._by_code.get(code)
+            if not v or v.get("used"):
+                return False
+            v = dict(v, used=True, used_at=datetime.now().isoformat(), cartillas=cartilla_ids)
+            self._append({"op": "put", "v": v})
+            return True
+
+    def delete(self, code: str) -> bool:
+        with self._lock:
+            if code not in self._by_code:
+                return False
+            self._append({"op": "del", "code": code})
+            return True
+
+class SqliteVoucherStore:
+    """Same operations as JsonVoucherStore, one row per voucher.
+
+    mark_used() is a conditional UPDATE, so two workers redeeming the same
+    code cannot both succeed.
+    """
+
+    def __init__(self, path: Path):
+        self._conn   = open_db(path)
+        self._lock   = threading.Lock()
+        self._writes = 0         # own commits (data_version only counts other connections')
+
+    @property
+    def version(self) -> str:
+        with self._lock:
+            return f"{self._conn.execute('PRAGMA data_version').fetchone()[0]}.{self._writes}"
+
+    def get(self, code: str):
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM vouchers WHERE code = ?", (code,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def list(self) -> list:
+        with self._lock:
+            rows = self._conn.execute("SELECT data FROM vouchers ORDER BY created DESC, code").fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    def create(self, fields: dict) -> dict:
+        with self._lock:
+            while True:
+                v = _new_voucher(_gen_voucher_code(), fields)
+                try:
+                    self._conn.execute("INSERT INTO vouchers (code, created, used, data) VALUES (?, ?, 0, ?)",
+                                       (v["code"], v["created"], json.dumps(v, ensure_ascii=False)))
+                    self._writes += 1
+                    return v
+                except sqlite3.IntegrityError:
+                    continue    # code taken, draw another
+
+    def mark_used(self, code: str, cartilla_ids: list) -> bool:
+        with self._lock, db_transaction(self._conn):
+            row = self._conn.execute("SELECT data FROM vouchers WHERE code = ? AND used = 0", (code,)).fetchone()
+            if not row:
+                return False
+            v = json.loads(row[0])
+            v["used"]      = True
+            v["used_at"]   = datetime.now().isoformat()
+            v["cartillas"] = cartilla_ids
+            self._conn.execute("UPDATE vouchers SET used = 1, data = ? WHERE code = ?",
+                               (json.dumps(v, ensure_ascii=False), code))
+            self._writes += 1
+            return True
+
+    def delete(self, code: str) -> bool:
+        with self._lock:
+            self._writes += 1
+            return self._conn.execute("DELETE FROM vouchers WHERE code = ?", (code,)).rowcount > 0
+
+if RENDER_WORKER:
+    voucher_store = None
+elif STORAGE == "sqlite":
+    voucher_store = SqliteVoucherStore(DB_PATH)
+else:
+    voucher_store = JsonVoucherStore(VOUCHERS_FILE)
 
 
 def get_voucher_info(code: str):
@@ -82,77 +332,863 @@ def get_voucher_info(code: str):
     code = (code or "").strip().upper()
     if not code:
         return None
-    with vouchers_lock:
-        vs = _load_vouchers()
-        v = _find_voucher(vs, code)
-        return dict(v) if v else None
+    return voucher_store.get(code)
 
 def validate_voucher_code(code: str) -> tuple:
     code = (code or "").strip().upper()
     if not code:
         return False, "bad_code"
-    with vouchers_lock:
-        vs = _load_vouchers()
-        v = _find_voucher(vs, code)
-        if not v:
-            return False, "bad_code"
-        if v.get("used"):
-            return False, "used_code"
+    v = voucher_store.get(code)
+    if not v:
+        return False, "bad_code"
+    if v.get("used"):
+        return False, "used_code"
     return True, ""
 
-def mark_voucher_used(code: str, cartilla_ids: list) -> None:
+def mark_voucher_used(code: str, cartilla_ids: list) -> bool:
+    """Redeem a voucher; False if it does not exist or was already used."""
     code = (code or "").strip().upper()
-    with vouchers_lock:
-        vs = _load_vouchers()
-        v = _find_voucher(vs, code)
-        if not v:
-            return
-        v["used"]     = True
-        v["used_at"]  = datetime.now().isoformat()
-        v["cartillas"] = cartilla_ids
-        _save_vouchers(vs)
+    return voucher_store.mark_used(code, cartilla_ids)
+
+def redeem_voucher(code: str, cards: list) -> bool:
+    """Redeem `code` for cards that are already stored. If another request
+    redeemed it first (validate_voucher_code() passed in both), the cards
+    are deleted again and False is returned."""
+    if mark_voucher_used(code, [c["id"] for c in cards]):
+        return True
+    cartilla_store.delete_many([c["id"] for c in cards])
+    return False
 
 # ─── Estado del juego ─────────────────────────────────────────────────────────
 class GameState:
+    """The game. Every change is an operation record (reset / draw / winner /
+    set) applied through apply(), so the same records can be journaled and
+    replayed after a restart; pending ones wait in `_ops` for game_lock."""
+
     def __init__(self):
+        self.version = 0   # bumped by every mutation, never reset (ETag / ?since=)
+        self._ops    = []  # records applied since game_lock last persisted them
         self.reset()
 
+    def _record(self, op: dict) -> dict:
+        op["v"] = self.version + 1
+        if op["op"] != "reset":
+            op["game"] = self.game_id   # replay skips records of another game
+        self.apply(op)
+        self._ops.append(op)
+        return op
+
+    def apply(self, op: dict) -> None:
+        """Apply one operation record; also used to replay the journal."""
+        kind = op["op"]
+        if kind == "reset":
+            self.available = list(range(1, 91))
+            self.drawn: list = []
+            self.drawn_versions = []      # version at which each drawn number appeared
+            self.last = None
+            # Winner notifications are tracked per game
+            self.game_id = op["game_id"]
+            self.claimed_winners = set()  # cartilla IDs that already claimed BINGO
+            self.winners_log = []         # list of winner dicts
+            self.winners_versions = []    # version at which each winner was logged
+            self.last_phrase = None       # last spoken phrase (for player audio)
+            self.last_voice  = "es-PE-CamilaNeural"  # voice used for last phrase
+            self.last_activity = None     # admin last draw timestamp (epoch)
+            self.paused        = False    # True when winners limit reached
+            self.winners_limit = 1        # how many winners before pausing
+            self.reset_version = op["v"]
+        elif kind == "draw":
+            self.available.remove(op["num"])
+            self.drawn.append(op["num"])
+            self.drawn_versions.append(op["v"])
+            self.last = op["num"]
+        elif kind == "winner":
+            self.claimed_winners.add(op["winner"]["id"])
+            self.winners_log.append(op["winner"])
+            self.winners_versions.append(op["v"])
+        elif kind == "set":
+            for name, value in op["fields"].items():
+                setattr(self, name, value)
+        self.version = op["v"]
+
     def reset(self):
-        self.available = list(range(1, 91))
-        self.drawn: list = []
-        self.last = None
-        # Winner notifications are tracked per game
-        self.game_id = str(uuid.uuid4())[:8].upper()
-        self.claimed_winners = set()  # cartilla IDs that already claimed BINGO
-        self.winners_log = []         # list of winner dicts
-        self.last_phrase = None       # last spoken phrase (for player audio)
-        self.last_voice  = "es-PE-CamilaNeural"  # voice used for last phrase
-        self.last_activity = None     # admin last draw timestamp (epoch)
-        self.paused        = False    # True when winners limit reached
-        self.winners_limit = 1        # how many winners before pausing
+        self._record({"op": "reset", "game_id": str(uuid.uuid4())[:8].upper()})
 
     def draw(self):
         if not self.available:
             return None
-        num = random.choice(self.available)
-        self.available.remove(num)
-        self.drawn.append(num)
-        self.last = num
-        return num
+        return self._record({"op": "draw", "num": random.choice(self.available)})["num"]
+
+    def add_winner(self, winner: dict) -> None:
+        """Log a winner; also marks its cartilla as claimed."""
+        self._record({"op": "winner", "winner": winner})
+
+    def set(self, **fields) -> None:
+        """Change scalar fields (paused, winners_limit, last_phrase, ...)."""
+        self._record({"op": "set", "fields": fields})
+
+    def take_ops(self) -> list:
+        ops, self._ops = self._ops, []
+        return ops
+
+    def to_dict(self) -> dict:
+        data = {k: v for k, v in vars(self).items() if not k.startswith("_")}
+        data["claimed_winners"] = sorted(self.claimed_winners)
+        return data
+
+    def load(self, data: dict) -> None:
+        self.__dict__.update(data)
+        self.claimed_winners = set(data.get("claimed_winners", ()))
+        self._ops = []
+
+class GameJournal:
+    """Crash-safe persistence of a local (single-process) game.
+
+    Every operation record is appended to `_game.journal` and fsync'ed before
+    the request answers; every `snapshot_every` records (and at each reset)
+    the whole state goes to `_game.snapshot.json` atomically and the journal
+    is truncated. Startup loads the snapshot and replays the records newer
+    than it, so the game comes back with the same game_id, draw order,
+    winners and versions.
+
+    Only one process may journal a directory: acquire() takes an flock on
+    `_game.lock` (a no-op where fcntl is missing). Replay skips records of
+    another game and records that do not fit the state (a number drawn
+    twice...), then rewrites the snapshot, so a bad journal never stops
+    the app from starting.
+    """
+
+    def __init__(self, directory: Path, snapshot_every: int = 100):
+        self.lock_path      = directory / "_game.lock"
+        self.snapshot_path  = directory / "_game.snapshot.json"
+        self.journal_path   = directory / "_game.journal"
+        self.snapshot_every = snapshot_every
+        self._records = 0
+        self._lock_file = None
+
+    def acquire(self) -> bool:
+        """Own the journal for the life of this process; False if another process does."""
+        if fcntl is None:
+            return True
+        f = open(self.lock_path, "a")
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            return False
+        self._lock_file = f
+        return True
+
+    def restore(self, state: GameState) -> bool:
+        """Load the saved game into `state`. False if there is none."""
+        found = False
+        if self.snapshot_path.exists():
+            state.load(json.loads(self.snapshot_path.read_text(encoding="utf-8")))
+            found = True
+        dirty = False
+        if self.journal_path.exists():
+            for line in self.journal_path.read_text(encoding="utf-8").splitlines():
+                try:
+                    op = json.loads(line)
+                except ValueError:
+                    dirty = True         # half-written last record after a crash
+                    continue
+                self._records += 1
+                if op.get("v", 0) <= state.version:
+                    continue             # already in the snapshot
+                if op.get("game", state.game_id) != state.game_id:
+                    dirty = True         # written by another process's game
+                    continue
+                try:
+                    state.apply(op)
+                except (KeyError, TypeError, ValueError):
+                    dirty = True         # does not fit the state: skip it
+                    continue
+                found = True
+        state.take_ops()
+        if dirty:
+            self.snapshot(state)
+        return found
+
+    def append(self, state: GameState, ops: list) -> None:
+        if any(op["op"] == "reset" for op in ops) or self._records + len(ops) >= self.snapshot_every:
+            self.snapshot(state)
+            return
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(op, ensure_ascii=False) + "\n" for op in ops))
+            f.flush()
+            os.fsync(f.fileno())
+        self._records += len(ops)
+
+    def snapshot(self, state: GameState) -> None:
+        tmp = self.snapshot_path.with_name(f".{self.snapshot_path.name}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(json.dumps(state.to_dict(), ensure_ascii=False))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.snapshot_path)
+        open(self.journal_path, "w").close()
+        self._records = 0
+
+# Share the game between gunicorn workers through the SQLite `game` row.
+# Defaults to on with BINGO_STORAGE=sqlite; BINGO_SHARED_GAME=0/1 overrides.
+SHARED_GAME = os.environ.get("BINGO_SHARED_GAME", "1" if STORAGE == "sqlite" else "0") == "1"
+SHARED_POLL = 0.5  # seconds; how stale another worker's change may look in this one
+
+class GameLock:
+    """The lock around every read (`with game_lock:`) or change
+    (`with game_lock.write():`) of `game`.
+
+    Local mode this is a plain threading.Lock for both. In shared mode `game`
+    is mirrored in one SQLite row, so every worker plays the same game and it
+    survives restarts: entering reloads `game` if another worker saved a newer
+    version (one indexed SELECT, no database lock for readers), and write()
+    also holds the database write lock (BEGIN IMMEDIATE) and saves `game` on
+    exit if its version moved.
+
+    Every write publishes a new StateSnapshot; current() hands out the latest
+    one without locking (shared mode re-checks the database at most every
+    SHARED_POLL seconds).
+    """
+
+    def __init__(self, state: GameState, path: Path = None, journal: GameJournal = None):
+        self.state   = state
+        self.journal = journal
+        self.snapshot = None          # StateSnapshot of the latest version
+        self._lock   = threading.Lock()
+        self._conn   = None
+        self._checked_at = 0.0
+        if journal is not None and not journal.restore(state):
+            journal.snapshot(state)          # first start: persist the fresh game
+        if path is not None:
+            self._conn = open_db(path)
+            with db_transaction(self._conn):
+                row = self._conn.execute("SELECT data FROM game WHERE id = 1").fetchone()
+                if row:
+                    state.load(json.loads(row[0]))   # resume the game after a restart
+                else:
+                    self._save()
+
+    @property
+    def shared(self) -> bool:
+        return self._conn is not None
+
+    def _pull(self):
+        row = self._conn.execute("SELECT data FROM game WHERE id = 1 AND version != ?",
+                                 (self.state.version,)).fetchone()
+        if row:
+            self.state.load(json.loads(row[0]))
+
+    def _save(self):
+        self._conn.execute("INSERT OR REPLACE INTO game (id, version, data) VALUES (1, ?, ?)",
+                           (self.state.version, json.dumps(self.state.to_dict(), ensure_ascii=False)))
+
+    def __enter__(self):
+        self._lock.acquire()
+        if self._conn is not None:
+            try:
+                self._pull()
+            except:
+                self._lock.release()
+                raise
+        return self.state
+
+    def __exit__(self, *exc):
+        self._lock.release()
+
+    def current(self) -> "StateSnapshot":
+        """Snapshot of the latest game version; lock-free when it is current."""
+        snap = self.snapshot
+        if snap is not None and (self._conn is None or time.monotonic() - self._checked_at < SHARED_POLL):
+            return snap
+        with self:
+            self._checked_at = time.monotonic()
+            if self.snapshot is None or self.snapshot.version != self.state.version:
+                self.snapshot = StateSnapshot()
+            return self.snapshot
+
+    @contextmanager
+    def write(self):
+        with self._lock:
+            if self._conn is None:
+                self.state.take_ops()
+                yield self.state
+                ops = self.state.take_ops()
+                if ops and self.journal is not None:
+                    self.journal.append(self.state, ops)
+            else:
+                with db_transaction(self._conn):
+                    self._pull()
+                    before = self.state.version
+                    yield self.state
+                    self.state.take_ops()
+                    if self.state.version != before:
+                        self._save()
+            if self.snapshot is None or self.snapshot.version != self.state.version:
+                self.snapshot = StateSnapshot()
 
 game      = GameState()
-game_lock = threading.Lock()
+if RENDER_WORKER:
+    game_lock = None
+elif SHARED_GAME:
+    game_lock = GameLock(game, DB_PATH, None)
+else:
+    _journal = GameJournal(CARTILLAS_DIR)
+    if not _journal.acquire():
+        print("[game] another process journals the game in this directory; this one keeps "
+              "its game in memory only (use BINGO_STORAGE=sqlite for several workers)")
+        _journal = None
+    game_lock = GameLock(game, None, _journal)
+
+ADMIN_TIMEOUT = 300  # seconds without draws before players see the admin as offline
+
+def admin_is_online() -> bool:
+    last_activity = getattr(game, 'last_activity', None)
+    return last_activity is None or (time.time() - last_activity) < ADMIN_TIMEOUT
+
+def game_state_dict() -> dict:
+    """Public game state (the /api/state body). Caller must hold game_lock."""
+    last_activity = getattr(game, 'last_activity', None)
+    admin_online  = admin_is_online()
+    return {
+        "version":       game.version,
+        "drawn":         list(game.drawn),
+        "remaining":     len(game.available),
+        "last":          game.last,
+        "game_id":       getattr(game, 'game_id', None),
+        "last_phrase":   getattr(game, 'last_phrase', None),
+        "last_voice":    getattr(game, 'last_voice', 'es-PE-CamilaNeural'),
+        "last_audio_url": audio_url(game.last_phrase, game.last_voice) if game.last_phrase else None,
+        "last_activity": last_activity,
+        "admin_online":  admin_online,
+        "paused":        getattr(game, 'paused', False),
+        "winners":       list(getattr(game, 'winners_log', [])),
+        "winners_limit": getattr(game, 'winners_limit', 1),
+    }
+
+class StateSnapshot:
+    """Immutable view of `game` at one version, built once per change.
+
+    Holds the /api/state body JSON-encoded for both values of admin_online
+    (which flips with time, not with mutations) and the versioned draws and
+    winners game_state_delta() needs, so readers never take game_lock.
+    Build with game_lock held; game_lock.current() returns the latest one.
+    """
+
+    def __init__(self):
+        state = game_state_dict()
+        self.version       = game.version
+        self.reset_version = game.reset_version
+        self.last_activity = game.last_activity
+        self.drawn         = tuple(zip(game.drawn, game.drawn_versions))
+        self.winners       = tuple(zip(game.winners_log, game.winners_versions))
+        self.marks         = (game.version, game.reset_version, len(game.drawn),
+                              len(game.winners_log), game.paused)
+        self.state         = state
+        self._bodies       = {}
+        for online in (True, False):
+            self._bodies[online] = json.dumps(dict(state, admin_online=online), ensure_ascii=False,
+                                              separators=(",", ":"))
+
+    def admin_online(self) -> bool:
+        return self.last_activity is None or (time.time() - self.last_activity) < ADMIN_TIMEOUT
+
+    def etag(self) -> str:
+        """Changes whenever the /api/state body would."""
+        return f"{self.version}-{int(self.admin_online())}"
+
+    def body(self) -> str:
+        return self._bodies[self.admin_online()]
+
+def game_state_delta(since: int, snap: StateSnapshot) -> dict:
+    """Only what changed after version `since`: new draws and winners plus the
+    small scalar fields. Falls back to the full state when `since` predates the
+    current game."""
+    state = dict(snap.state, admin_online=snap.admin_online())
+    if since < snap.reset_version:
+        return dict(state, delta=False)
+    state.pop("drawn")
+    state.pop("winners")
+    state.update({
+        "delta":       True,
+        "since":       since,
+        "drawn_count": len(snap.drawn),
+        "new_drawn":   [n for n, v in snap.drawn if v > since],
+        "new_winners": [w for w, v in snap.winners if v > since],
+    })
+    return state
+
+# ─── Eventos del juego (SSE) ──────────────────────────────────────────────────
+class GameEvents:
+    """Fan-out of game changes to /api/state/stream listeners.
+
+    Each event carries the full public state, the snapshot's pre-encoded body
+    shared by every listener. A listener that falls further behind than
+    `backlog` events only misses intermediate states, never the latest one.
+    Each open stream pins a worker thread, so join() admits at most `limit`
+    listeners per process.
+    """
+
+    def __init__(self, backlog: int = 64):
+        self.seq   = 0
+        self.marks = None            # _state_marks() of the last published state
+        self.listeners = 0
+        self._cond = threading.Condition()
+        self._log  = deque(maxlen=backlog)
+
+    def join(self, limit: int) -> bool:
+        with self._cond:
+            if self.listeners >= limit:
+                return False
+            self.listeners += 1
+            return True
+
+    def leave(self) -> None:
+        with self._cond:
+            self.listeners -= 1
+
+    def publish(self, kind: str, data: str) -> None:
+        with self._cond:
+            self.seq += 1
+            self._log.append((self.seq, kind, data))
+            self._cond.notify_all()
+
+    def wait(self, after: int, timeout: float) -> list:
+        """Events newer than `after`, blocking up to `timeout` seconds for one."""
+        with self._cond:
+            if self.seq <= after:
+                self._cond.wait(timeout)
+            return [e for e in self._log if e[0] > after]
+
+game_events = GameEvents()
+SSE_REFRESH = 30  # seconds; idle streams get a fresh state (keeps admin_online current)
+SSE_MAX_LISTENERS = int(os.environ.get("SSE_MAX_LISTENERS", "48"))   # per worker; keep below --threads
+SSE_MAX_AGE = float(os.environ.get("SSE_MAX_AGE", "300"))  # seconds; then the client reconnects
+
+def publish_state(*kinds: str) -> None:
+    snap = game_lock.current()
+    game_events.marks = snap.marks
+    for kind in kinds:
+        game_events.publish(kind, snap.body())
+
+def _watch_shared_game():
+    """Shared mode: publish changes made by other workers to this worker's
+    SSE listeners, naming the event after what changed."""
+    while True:
+        time.sleep(SHARED_POLL)
+        try:
+            snap = game_lock.current()
+            marks, prev = snap.marks, game_events.marks
+            if prev is not None and marks[0] == prev[0]:
+                continue
+            game_events.marks = marks
+        except Exception as e:
+            print(f"[game] shared state poll failed: {e}")
+            continue
+        if prev is None:
+            continue
+        if marks[1] != prev[1]:
+            kinds = ["reset"]
+        else:
+            kinds = [k for k, hit in (("draw",   marks[2] > prev[2]),
+                                      ("winner", marks[3] > prev[3]),
+                                      ("pause",  marks[4] and not prev[4]),
+                                      ("resume", prev[4] and not marks[4])) if hit] or ["state"]
+        for kind in kinds:
+            game_events.publish(kind, snap.body())
+
+_watcher_lock    = threading.Lock()
+_watcher_started = False
+
+def start_shared_watcher() -> None:
+    global _watcher_started
+    if not game_lock.shared:
+        return
+    with _watcher_lock:
+        if not _watcher_started:
+            _watcher_started = True
+            threading.Thread(target=_watch_shared_game, name="game-watch", daemon=True).start()
 
 # ─── TTS ──────────────────────────────────────────────────────────────────────
-async def _tts_save(text, voice, path):
-    await edge_tts.Communicate(text, voice=voice).save(path)
+# Voices the warm-up job pre-renders (comma separated). Defaults match the
+# admin and player voice selectors' defaults.
+TTS_VOICES = [v.strip() for v in os.environ.get(
+    "TTS_VOICES", "es-PE-CamilaNeural,es-MX-DaliaNeural").split(",") if v.strip()]
+TTS_WARMUP = os.environ.get("TTS_WARMUP", "1") != "0"   # pre-render on `python app.py` and on reset
+
+class EdgeTTSSynthesizer:
+    """Default synthesizer backend (Microsoft Edge online voices).
+
+    A backend is any object with `async synthesize(text, voice, path)` that
+    writes an MP3 to `path`; swap it with set_tts_backend() (e.g. a local stub
+    in tests so nothing goes to the network).
+    """
+
+    async def synthesize(self, text: str, voice: str, path: str) -> None:
+        await edge_tts.Communicate(text, voice=voice).save(path)
+
+class SilentSynthesizer:
+    """Offline backend (TTS_BACKEND=silent): writes a short silent MP3 after
+    `delay` seconds. For development without network and for benchmarks."""
+
+    FRAME = b"\xff\xfb\x90\x64" + bytes(413)   # MPEG-1 Layer III, 128 kbps, 44.1 kHz
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+
+    async def synthesize(self, text: str, voice: str, path: str) -> None:
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        with open(path, "wb") as f:
+            f.write(self.FRAME * 10)
+
+TTS_BACKENDS = {"edge": EdgeTTSSynthesizer, "silent": SilentSynthesizer}
+tts_backend  = TTS_BACKENDS.get(os.environ.get("TTS_BACKEND", "edge"), EdgeTTSSynthesizer)()
+tts_stats   = {"hits": 0, "misses": 0, "errors": 0, "coalesced": 0, "evicted": 0, "memory_hits": 0}
+_tts_stats_lock = threading.Lock()
+
+def set_tts_backend(backend) -> None:
+    global tts_backend
+    tts_backend = backend
+
+def _tts_count(key: str, n: int = 1) -> None:
+    with _tts_stats_lock:
+        tts_stats[key] += n
+
+class TTSDiskCache:
+    """LRU bookkeeping for the MP3 files in `directory`.
+
+    Bounded by total size and file count; the least recently used files are
+    deleted once either limit is exceeded. Recency survives restarts through
+    the files' mtime, which is bumped on every hit.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int, max_files: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self.bytes     = 0
+        self._lock     = threading.Lock()
+        self._files    = OrderedDict()   # name -> size, least recently used first
+        entries = []
+        for entry in os.scandir(directory):
+            if entry.name.endswith(".mp3") and not entry.name.startswith("."):
+                st = entry.stat()
+                entries.append((st.st_mtime, entry.name, st.st_size))
+        for _, name, size in sorted(entries):
+            self._files[name] = size
+            self.bytes += size
+        self._evict()
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def path_for(self, text: str, voice: str) -> Path:
+        return self.directory / f"{audio_key(text, voice)}.mp3"
+
+    def touch(self, path: Path) -> bool:
+        """True (and mark as recently used) if `path` is cached on disk."""
+        try:
+            os.utime(path)
+            size = path.stat().st_size
+        except FileNotFoundError:
+            with self._lock:
+                self.bytes -= self._files.pop(path.name, 0)
+            return False
+        with self._lock:
+            if path.name not in self._files:   # written by another worker
+                self.bytes += size
+            else:
+                self.bytes += size - self._files[path.name]
+            self._files[path.name] = size
+            self._files.move_to_end(path.name)
+        return True
+
+    def add(self, path: Path) -> None:
+        self.touch(path)
+        with self._lock:
+            self._evict()
+
+    def _evict(self):
+        while self._files and (self.bytes > self.max_bytes or len(self._files) > self.max_files):
+            name, size = self._files.popitem(last=False)
+            self.bytes -= size
+            try:
+                (self.directory / name).unlink()
+            except FileNotFoundError:
+                pass
+            _tts_count("evicted")
+
+tts_cache = None if RENDER_WORKER else TTSDiskCache(
+    TTS_DIR,
+    max_bytes=int(float(os.environ.get("TTS_CACHE_MAX_MB", "200")) * 1024 * 1024),
+    max_files=int(os.environ.get("TTS_CACHE_MAX_FILES", "5000")))
+class TTSBusyError(RuntimeError):
+    """Too many syntheses queued; the caller should retry later (HTTP 503)."""
+
+class TTSWorker:
+    """One long-lived asyncio loop in a daemon thread that runs every synthesis.
+
+    Request threads submit jobs and block on the result with a timeout. At most
+    `concurrency` syntheses run at once; at most `max_pending` may be queued or
+    running before new submissions are rejected with TTSBusyError. The loop is
+    started lazily (and again after a fork) in the process that uses it.
+    """
+
+    def __init__(self, concurrency: int, max_pending: int, timeout: float):
+        self.concurrency = concurrency
+        self.max_pending = max_pending
+        self.timeout     = timeout
+        self.pending     = 0
+        self._lock = threading.Lock()
+        self._loop = None
+        self._sem  = None
+        self._pid  = None
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._loop is not None and self._pid == os.getpid():
+                return
+            loop  = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run():
+                asyncio.set_event_loop(loop)
+                self._sem = asyncio.Semaphore(self.concurrency)
+                ready.set()
+                loop.run_forever()
+
+            threading.Thread(target=run, name="tts-loop", daemon=True).start()
+            ready.wait()
+            self._loop, self._pid = loop, os.getpid()
+
+    async def _guarded(self, coro):
+        async with self._sem:
+            return await asyncio.wait_for(coro, self.timeout)
+
+    def run(self, coro_fn, *args):
+        """Run `coro_fn(*args)` on the loop and wait for it (TimeoutError on timeout)."""
+        self._ensure_started()
+        with self._lock:
+            if self.pending >= self.max_pending:
+                raise TTSBusyError("tts queue full")
+            self.pending += 1
+        try:
+            fut = asyncio.run_coroutine_threadsafe(self._guarded(coro_fn(*args)), self._loop)
+            try:
+                # queue wait + synthesis; the synthesis itself is capped by wait_for
+                return fut.result(self.timeout * 2)
+            except concurrent.futures.TimeoutError:
+                fut.cancel()
+                raise TimeoutError("tts timeout")
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+    def status(self) -> dict:
+        return {"concurrency": self.concurrency, "max_pending": self.max_pending,
+                "pending": self.pending, "timeout": self.timeout}
+
+tts_worker = TTSWorker(concurrency=int(os.environ.get("TTS_CONCURRENCY", "4")),
+                       max_pending=int(os.environ.get("TTS_QUEUE_MAX", "8")),   # per worker; well below --threads
+                       timeout=float(os.environ.get("TTS_TIMEOUT", "20")))
+_tts_inflight      = {}   # file name -> threading.Event of the synthesis in progress
+_tts_inflight_lock = threading.Lock()
+
+def draw_phrase(num: int, count: int) -> str:
+    """What api_draw announces for the `count`-th ball."""
+    words = num2words(num, lang="es")
+    if count == 1:
+        return f"Primera bolilla, número {words}"
+    if count == 90:
+        return f"Última bolilla, número {words}. Juego completo!"
+    return f"La siguiente bolilla es el número {words}"
+
+def repeat_phrase(num: int) -> str:
+    return f"Repito, bolilla número {num2words(num, lang='es')}"
+
+def tts_game_phrases() -> list:
+    """Every phrase api_draw and api_repeat can produce."""
+    phrases = []
+    for n in range(1, 91):
+        phrases += [draw_phrase(n, 1), draw_phrase(n, 2), draw_phrase(n, 90), repeat_phrase(n)]
+    return phrases
 
 def make_audio(text, voice):
-    safe  = "".join(c for c in text.lower() if c.isalnum() or c in " _-").replace(" ", "_")[:60] or "tts"
-    fpath = TTS_DIR / f"{voice}_{safe}.mp3"
-    if not fpath.exists():
-        asyncio.run(_tts_save(text, voice, str(fpath)))
-    return fpath
+    """Cached MP3 path for (text, voice), synthesizing it on a miss.
+
+    Concurrent misses for the same key share one synthesis: the first caller
+    renders into a temp file and renames it into place, the rest wait for it.
+    """
+    fpath = tts_cache.path_for(text, voice)
+    while True:
+        if tts_cache.touch(fpath):
+            _tts_count("hits")
+            return fpath
+        with _tts_inflight_lock:
+            pending = _tts_inflight.get(fpath.name)
+            if pending is None:
+                pending = _tts_inflight[fpath.name] = threading.Event()
+                pending.error = None
+                break
+        _tts_count("coalesced")
+        if not pending.wait(tts_worker.timeout * 2):
+            raise TimeoutError("tts timeout")
+        if pending.error is not None:
+            raise pending.error
+
+    tmp = fpath.with_name(f".{fpath.name}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        if tts_cache.touch(fpath):   # finished by someone else just before we registered
+            _tts_count("hits")
+            return fpath
+        _tts_count("misses")
+        tts_worker.run(tts_backend.synthesize, text, voice, str(tmp))
+        os.replace(tmp, fpath)
+        tts_cache.add(fpath)
+        return fpath
+    except Exception as e:
+        _tts_count("errors")
+        pending.error = e
+        raise
+    finally:
+        tmp.unlink(missing_ok=True)
+        with _tts_inflight_lock:
+            _tts_inflight.pop(fpath.name, None)
+        pending.set()
+
+# ─── Audio en memoria + URLs direccionadas por contenido ──────────────────────
+def audio_key(text: str, voice: str) -> str:
+    return hashlib.sha1(f"{voice}\n{text}".encode("utf-8")).hexdigest()[:20]
+
+class BytesLRU:
+    """LRU of bytes values (MP3s by audio_key(), rendered cards), bounded by total bytes."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.bytes     = 0
+        self._lock     = threading.Lock()
+        self._items    = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            data = self._items.get(key)
+            if data is not None:
+                self._items.move_to_end(key)
+            return data
+
+    def put(self, key, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            self.bytes -= len(self._items.pop(key, b""))
+            self._items[key] = data
+            self.bytes += len(data)
+            while self.bytes > self.max_bytes:
+                _, old = self._items.popitem(last=False)
+                self.bytes -= len(old)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+tts_memory = BytesLRU(int(float(os.environ.get("TTS_MEMORY_MB", "32")) * 1024 * 1024))
+def audio_url(text: str, voice: str) -> str:
+    """Content-addressed URL for a phrase. Voice and text travel in the query
+    string, so any worker can serve it, also after a restart."""
+    return f"/api/audio/{audio_key(text, voice)}.mp3?" + urlencode({"voice": voice, "text": text})
+
+def get_audio(text: str, voice: str) -> tuple:
+    """(key, mp3 bytes) for a phrase: RAM first, then the disk cache / synthesis."""
+    key  = audio_key(text, voice)
+    data = tts_memory.get(key)
+    if data is not None:
+        _tts_count("memory_hits")
+        return key, data
+    data = make_audio(text, voice).read_bytes()
+    tts_memory.put(key, data)
+    return key, data
+
+def tts_error_response(e: Exception):
+    if isinstance(e, TTSBusyError):
+        resp = jsonify({"error": "tts_busy"})
+        resp.status_code = 503
+        resp.headers["Retry-After"] = "2"
+        return resp
+    if isinstance(e, TimeoutError):
+        return jsonify({"error": "tts_timeout"}), 504
+    return jsonify({"error": str(e)}), 500
+
+def audio_response(key: str, data: bytes, immutable: bool = False):
+    """MP3 response with a strong ETag and Range support (206 / 304 handled here)."""
+    resp = Response(data, mimetype="audio/mpeg")
+    resp.set_etag(key)
+    if immutable:
+        resp.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    else:
+        resp.headers["Cache-Control"] = "no-cache"
+    return resp.make_conditional(request, accept_ranges=True, complete_length=len(data))
+
+class TTSWarmup:
+    """Background job that pre-renders every game phrase for the given voices,
+    so the first /api/speak for a new ball is a cache hit."""
+
+    def __init__(self):
+        self._lock   = threading.Lock()
+        self._thread = None
+        self.voices  = []
+        self.total   = 0
+        self.done    = 0
+        self.failed  = 0
+        self.started_at  = None
+        self.finished_at = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, voices: list = None) -> bool:
+        """Start the job unless it is already running. Returns True if started."""
+        with self._lock:
+            if self.running:
+                return False
+            self.voices  = list(voices or TTS_VOICES)
+            phrases      = tts_game_phrases()
+            self.total   = len(phrases) * len(self.voices)
+            self.done    = 0
+            self.failed  = 0
+            self.started_at  = time.time()
+            self.finished_at = None
+            self._thread = threading.Thread(target=self._run, args=(self.voices, phrases),
+                                            name="tts-warmup", daemon=True)
+            self._thread.start()
+            return True
+
+    def _run(self, voices: list, phrases: list):
+        for voice in voices:
+            for phrase in phrases:
+                try:
+                    make_audio(phrase, voice)
+                except Exception:
+                    self.failed += 1
+                self.done += 1
+        self.finished_at = time.time()
+
+    def status(self) -> dict:
+        return {
+            "running":     self.running,
+            "voices":      self.voices,
+            "total":       self.total,
+            "done":        self.done,
+            "failed":      self.failed,
+            "progress":    round(self.done / self.total, 3) if self.total else 0,
+            "started_at":  self.started_at,
+            "finished_at": self.finished_at,
+            "cache":       dict(tts_stats, files=len(tts_cache), bytes=tts_cache.bytes,
+                                memory_items=len(tts_memory), memory_bytes=tts_memory.bytes),
+            "worker":      tts_worker.status(),
+        }
+
+tts_warmup = TTSWarmup()
 
 def get_local_ip():
     try:
@@ -177,64 +1213,649 @@ COL_RANGES = [
     list(range(80, 91)),
 ]
 
-def generate_cartilla_grid():
-    for _ in range(1000):
-        col_counts = [1] * 9
-        extras = random.sample(range(9), 6)
-        for e in extras:
-            col_counts[e] = 2
-
-        col_rows = []
-        for c in range(9):
-            col_rows.append(random.sample([0, 1, 2], col_counts[c]))
-
-        row_counts = [0, 0, 0]
-        for c in range(9):
-            for r in col_rows[c]:
-                row_counts[r] += 1
-        if row_counts != [5, 5, 5]:
-            continue
-
+# A card has six 2-number columns and three 1-number columns (15 numbers).
+# Each 2-number column leaves one row empty ("skips" it) and each 1-number
+# column fills one row, so row r holds 5 numbers exactly when it takes
+# skips[r] - 1 singles. A valid layout is therefore a split (s0, s1, s2) of
+# the six skips with every part >= 1; weighting each split by how many
+# layouts realise it makes the result uniform over all valid layouts (the same
+# distribution the old rejection sampler had, without the rejections).
+def _skip_splits():
+    fact = [1, 1, 2, 6, 24, 120, 720]
+    splits, weights = [], []
+    for s0 in range(1, 5):
+        for s1 in range(1, 5):
+            s2 = 6 - s0 - s1
+            if s2 < 1:
+                continue
+            splits.append((s0, s1, s2))
+            weights.append(fact[6] // (fact[s0] * fact[s1] * fact[s2])
+                           * fact[3] // (fact[s0 - 1] * fact[s1 - 1] * fact[s2 - 1]))
+    return splits, weights
+
+_SKIP_SPLITS, _SKIP_WEIGHTS = _skip_splits()
+_SKIP_CUM = list(itertools.accumulate(_SKIP_WEIGHTS))
+
+def _layout_rows(doubles: list, singles: list, rng) -> dict:
+    """Rows used by each column: {col: [rows]}, 5 per row. Shuffles its inputs."""
+    s0, s1, _ = rng.choices(_SKIP_SPLITS, cum_weights=_SKIP_CUM)[0]
+    rng.shuffle(doubles)
+    rng.shuffle(singles)
+    layout = {}
+    for i, c in enumerate(doubles):
+        skip = 0 if i < s0 else 1 if i < s0 + s1 else 2
+        layout[c] = [r for r in (0, 1, 2) if r != skip]
+    for i, c in enumerate(singles):
+        layout[c] = [0 if i < s0 - 1 else 1 if i < s0 + s1 - 2 else 2]
+    return layout
+
+def generate_cartilla_grid(rng=None):
+    """Random valid 3x9 grid: 15 numbers, 5 per row, 1-2 per column, sorted
+    down each column. Built directly in one pass (no retries).
+
+    `rng` may be a random.Random or an int seed for reproducible output.
+    """
+    if rng is None:
+        rng = random
+    elif isinstance(rng, int):
+        rng = random.Random(rng)
+    cols = list(range(9))
+    rng.shuffle(cols)
+    layout = _layout_rows(cols[:6], cols[6:], rng)
+
+    grid = [[None] * 9 for _ in range(3)]
+    for c, rows in layout.items():
+        nums = sorted(rng.sample(COL_RANGES[c], len(rows)))
+        for r, n in zip(rows, nums):
+            grid[r][c] = n
+    return grid
+
+# ─── Tiras de 6 cartillas (1–90 exactamente una vez) ─────────────────────────
+STRIP_SIZE     = 6
+_STRIP_DOUBLES = [len(col) - STRIP_SIZE for col in COL_RANGES]   # 2-number cards per column
+_PERM6   = list(itertools.permutations(range(6)))
+_PERM3   = list(itertools.permutations(range(3)))
+_SINGLES = {d: [c for c in range(9) if c not in d] for d in itertools.combinations(range(9), 6)}
+
+def _strip_doubles(rng) -> list:
+    """Which columns hold two numbers on each of the 6 cards.
+
+    A 6x9 0/1 matrix with 6 ones per card and len(col) - 6 ones per column,
+    filled column by column giving each column's ones to the cards that still
+    need the most (ties broken at random). This greedy order always finishes
+    when the margins are feasible, which they are here.
+    """
+    need    = [6] * STRIP_SIZE
+    doubles = [[] for _ in range(STRIP_SIZE)]
+    rand    = rng.random
+    for c in sorted(range(9), key=lambda _: rand()):
+        # Stable sort: a random permutation first, so ties stay random.
+        order = sorted(_PERM6[int(rand() * 720)], key=need.__getitem__, reverse=True)
+        for i in order[:_STRIP_DOUBLES[c]]:
+            need[i] -= 1
+            doubles[i].append(c)
+    return doubles
+
+def generate_strip(rng=None) -> list:
+    """Six valid grids that together contain every number 1-90 exactly once.
+
+    Same row layout as generate_cartilla_grid() per card; the column numbers
+    are shuffled once and dealt out, so nothing is ever retried. Shuffles are
+    table lookups / random sort keys because bulk strips are hot.
+    """
+    if rng is None:
+        rng = random
+    elif isinstance(rng, int):
+        rng = random.Random(rng)
+    rand  = rng.random
+    total = _SKIP_CUM[-1]
+    pools = [sorted(col, key=lambda _: rand()) for col in COL_RANGES]
+    grids = []
+    for doubles in _strip_doubles(rng):
+        s0, s1, _ = _SKIP_SPLITS[bisect.bisect(_SKIP_CUM, rand() * total)]
+        singles = _SINGLES[tuple(sorted(doubles))]
         grid = [[None] * 9 for _ in range(3)]
-        for c in range(9):
-            nums = sorted(random.sample(COL_RANGES[c], col_counts[c]))
-            for i, r in enumerate(sorted(col_rows[c])):
-                grid[r][c] = nums[i]
-        return grid
+        for i, k in enumerate(_PERM6[int(rand() * 720)]):
+            c = doubles[k]
+            a, b = pools[c].pop(), pools[c].pop()
+            if a > b:
+                a, b = b, a
+            skip = 0 if i < s0 else 1 if i < s0 + s1 else 2
+            grid[1 if skip == 0 else 0][c] = a
+            grid[1 if skip == 2 else 2][c] = b
+        for i, k in enumerate(_PERM3[int(rand() * 6)]):
+            c = singles[k]
+            grid[0 if i < s0 - 1 else 1 if i < s0 + s1 - 2 else 2][c] = pools[c].pop()
+        grids.append(grid)
+    return grids
+
+# ─── Almacén de cartillas (índice en memoria) ─────────────────────────────────
+def grid_fingerprint(grid: list) -> str:
+    """Canonical key of a grid's number set: the 90-bit set as 23 hex digits.
+
+    Two cards with the same 15 numbers share it whatever their row layout,
+    so it doubles as the uniqueness key (exact, no hash collisions).
+    """
+    m = 0
+    for row in grid:
+        for n in row:
+            if n is not None:
+                if type(n) is not int or not 1 <= n <= 90:
+                    raise ValueError(f"invalid number in grid: {n!r}")
+                m |= 1 << (n - 1)
+    return f"{m:023x}"
+
+def card_fingerprint(card: dict) -> str:
+    """grid_fingerprint() of a stored card. Cards saved before grids were
+    validated may hold cells outside 1-90; they get a per-id key instead,
+    so they still load and never match another card."""
+    try:
+        return grid_fingerprint(card["grid"])
+    except (TypeError, ValueError):
+        return f"invalid-{card['id']}"
+
+class DuplicateGridError(ValueError):
+    """A cartilla with the same numbers already exists (its id is `.cid`)."""
+
+    def __init__(self, cid: str):
+        super().__init__(f"duplicate of {cid}")
+        self.cid = cid
+
+class CartillaStore:
+    """In-memory index of the cartillas stored in `directory`.
+
+    Cartillas live either one per `<ID>.json` file or many per append-only
+    `*.ndjson` segment (one JSON object per line, written in a single call by
+    bulk generation). Deleting a card from a segment appends a
+    {"deleted": id} tombstone line instead of rewriting it; the file goes
+    away once every card in it is deleted. Loaded once at startup and kept current by put/put_many/
+    delete/clear. Files written by another process are picked up by polling:
+    the directory mtime is checked every `check_interval` seconds (it changes
+    when files are added or removed) and a full per-file mtime sweep runs every
+    `rescan_interval` seconds to catch in-place edits. Only new or modified
+    files are parsed again.
+
+    Every card also carries its grid_fingerprint() ("fingerprint", computed
+    for older records on load), indexed so put/put_many refuse a second card
+    with the same numbers in O(1).
+    """
 
-    raise RuntimeError("No se pudo generar cartilla válida")
+    def __init__(self, directory: Path, check_interval: float = 2.0, rescan_interval: float = 30.0):
+        self.directory       = directory
+        self.check_interval  = check_interval
+        self.rescan_interval = rescan_interval
+        self.version    = 0          # bumped on every change to the index
+        self._lock      = threading.RLock()
+        self._by_id     = {}         # cid -> cartilla dict
+        self._source    = {}         # cid -> file name holding it
+        self._by_fp     = {}         # fingerprint -> cid
+        self._files     = {}         # file name -> (mtime_ns, [cids])
+        self._sorted    = None       # cached list ordered by id
+        self._dir_mtime = None
+        self._checked_at = 0.0
+        self._scanned_at = 0.0
+
+    def __contains__(self, cid: str) -> bool:
+        return cid in self._by_id
+
+    def owner(self, fingerprint: str):
+        """Id of the cartilla with this fingerprint, or None."""
+        self.refresh()
+        return self._by_fp.get(fingerprint)
+
+    def _changed(self):
+        self.version += 1
+        self._sorted  = None
+
+    def _dir_stat(self):
+        try:
+            return self.directory.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
 
-def save_cartilla(nombre: str, grid: list, telefono: str = '', voucher_code: str = '') -> dict:
-    cid  = str(uuid.uuid4())[:8].upper()
+    @staticmethod
+    def _is_data_file(name: str) -> bool:
+        return not name.startswith(("_", ".")) and name.endswith((".json", ".ndjson"))
+
+    @staticmethod
+    def _read(path: Path) -> list:
+        text = path.read_text(encoding="utf-8")
+        if path.suffix == ".json":
+            data = json.loads(text)
+            data.setdefault("id", path.stem)
+            return [data]
+        records = []
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue                 # torn by a crash mid-append; the rest stands
+        dead = {r["deleted"] for r in records if "deleted" in r}
+        return [r for r in records if "deleted" not in r and r["id"] not in dead]
+
+    def _add(self, name: str, card: dict):
+        cid = card["id"]
+        old = self._by_id.get(cid)
+        if old is not None:
+            self._by_fp.pop(old["fingerprint"], None)
+        if "fingerprint" not in card:
+            card["fingerprint"] = card_fingerprint(card)
+        self._by_id[cid]  = card
+        self._source[cid] = name
+        self._by_fp[card["fingerprint"]] = cid
+
+    def _drop(self, cid: str):
+        card = self._by_id.pop(cid)
+        del self._source[cid]
+        if self._by_fp.get(card["fingerprint"]) == cid:
+            del self._by_fp[card["fingerprint"]]
+
+    def _check_unique(self, cards: list):
+        seen = {}
+        for card in cards:
+            if "fingerprint" not in card:
+                card["fingerprint"] = card_fingerprint(card)
+            fp = card["fingerprint"]
+            cid = self._by_fp.get(fp) or seen.get(fp)
+            if cid is not None and cid != card["id"]:
+                raise DuplicateGridError(cid)
+            seen[fp] = card["id"]
+
+    def _index(self, name: str, cards: list):
+        for card in cards:
+            self._add(name, card)
+        self._files[name] = (self._mtime(name), [c["id"] for c in cards])
+
+    def _mtime(self, name: str):
+        try:
+            return (self.directory / name).stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _scan(self):
+        """Stat every data file and (re)parse only new or modified ones."""
+        files, changed = {}, False
+        for entry in os.scandir(self.directory):
+            name = entry.name
+            if not self._is_data_file(name):
+                continue
+            try:
+                mtime = entry.stat().st_mtime_ns
+            except FileNotFoundError:
+                continue
+            old = self._files.get(name)
+            if old and old[0] == mtime:
+                files[name] = old
+                continue
+            try:
+                cards = self._read(Path(entry.path))
+            except:
+                # Half-written or corrupt: keep whatever we had and retry next sweep
+                if old:
+                    files[name] = old
+                continue
+            for card in cards:
+                self._add(name, card)
+            files[name] = (mtime, [c["id"] for c in cards])
+            changed = True
+        live = {cid for _, cids in files.values() for cid in cids}
+        for cid in [cid for cid in self._by_id if cid not in live]:
+            self._drop(cid)
+            changed = True
+        self._files = files
+        if changed:
+            self._changed()
+
+    def refresh(self, force: bool = False) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._checked_at < self.check_interval:
+                return
+            self._checked_at = now
+            dir_mtime = self._dir_stat()
+            if force or dir_mtime != self._dir_mtime or now - self._scanned_at >= self.rescan_interval:
+                self._dir_mtime  = dir_mtime
+                self._scanned_at = now
+                self._scan()
+
+    def get(self, cid: str):
+        self.refresh()
+        return self._by_id.get(cid)
+
+    def all(self) -> list:
+        """All cartillas ordered by id. The list is shared — do not mutate it."""
+        self.refresh()
+        with self._lock:
+            if self._sorted is None:
+                self._sorted = [self._by_id[k] for k in sorted(self._by_id)]
+            return self._sorted
+
+    def _write(self, name: str, text: str):
+        """Write a data file atomically and durably (temp file + fsync + rename)."""
+        tmp = self.directory / f".{name}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.directory / name)
+
+    def _append(self, name: str, text: str):
+        """Append lines to a segment and fsync them. A torn last line left by
+        a crash is closed off first, so the new lines stay parseable."""
+        with open(self.directory / name, "rb+") as f:
+            size = f.seek(0, os.SEEK_END)
+            if size:
+                f.seek(size - 1)
+                if f.read(1) != b"\n":
+                    text = "\n" + text
+            f.write(text.encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def put(self, data: dict) -> None:
+        """Persist one cartilla. Raises DuplicateGridError if another card has its numbers."""
+        name = f"{data['id']}.json"
+        self.refresh()
+        with self._lock:
+            self._check_unique([data])
+            self._write(name, json.dumps(data, ensure_ascii=False))
+            self._index(name, [data])
+            self._dir_mtime = self._dir_stat()
+            self._changed()
+
+    def put_many(self, cards: list) -> str:
+        """Persist a batch as one append-only segment file (a single write).
+
+        All or nothing: raises DuplicateGridError before writing if any card
+        repeats the numbers of a stored card or of another card in the batch.
+        """
+        name = f"seg-{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}.ndjson"
+        self.refresh()
+        with self._lock:
+            self._check_unique(cards)
+            text = "".join(json.dumps(c, ensure_ascii=False) + "\n" for c in cards)
+            self._write(name, text)
+            self._index(name, cards)
+            self._dir_mtime = self._dir_stat()
+            self._changed()
+        return name
+
+    def delete(self, cid: str) -> bool:
+        return self.delete_many([cid]) == 1
+
+    def delete_many(self, cids) -> int:
+        """Delete cartillas by id (one tombstone write per segment); returns how many existed."""
+        self.refresh()
+        with self._lock:
+            by_file = {}
+            for cid in cids:
+                name = self._source.get(cid)
+                if name is not None:
+                    by_file.setdefault(name, set()).add(cid)
+            for name, gone in by_file.items():
+                rest = [c for c in self._files[name][1] if c not in gone]
+                if rest:                 # a segment keeping other cards
+                    self._append(name, "".join(json.dumps({"deleted": cid}) + "\n" for cid in gone))
+                    self._files[name] = (self._mtime(name), rest)
+                else:
+                    (self.directory / name).unlink(missing_ok=True)
+                    del self._files[name]
+                for cid in gone:
+                    self._drop(cid)
+            if by_file:
+                self._dir_mtime = self._dir_stat()
+                self._changed()
+            return sum(len(gone) for gone in by_file.values())
+
+    def clear(self) -> int:
+        with self._lock:
+            self.refresh(force=True)
+            count = len(self._by_id)
+            for name in list(self._files):
+                (self.directory / name).unlink(missing_ok=True)
+            self._by_id.clear()
+            self._source.clear()
+            self._by_fp.clear()
+            self._files.clear()
+            self._dir_mtime = self._dir_stat()
+            self._changed()
+        return count
+
+class SqliteCartillaStore(CartillaStore):
+    """CartillaStore backed by the SQLite database (BINGO_STORAGE=sqlite).
+
+    Same in-memory index and API; rows carry indexed id / voucher_code /
+    created columns and a UNIQUE fingerprint, so duplicates are refused by
+    the database even across worker processes. Other processes' commits are
+    noticed through `PRAGMA data_version`; only rows with a higher `seq` are
+    read back, plus an id sweep when the row count shows deletions.
+    """
+
+    def __init__(self, path: Path, check_interval: float = 1.0):
+        super().__init__(path.parent, check_interval=check_interval)
+        self.path  = path
+        self._conn = open_db(path)
+        self._seq  = 0               # highest row seq already indexed
+        self._data_version = None
+
+    def _row(self, card: dict) -> tuple:
+        if "fingerprint" not in card:
+            card["fingerprint"] = card_fingerprint(card)
+        return (card["id"], card.get("voucher_code", ""), card.get("created", ""),
+                card["fingerprint"], json.dumps(card, ensure_ascii=False))
+
+    def _pull(self) -> bool:
+        changed = False
+        rows = self._conn.execute("SELECT seq, data FROM cartillas WHERE seq > ? ORDER BY seq",
+                                  (self._seq,)).fetchall()
+        for seq, text in rows:
+            card = json.loads(text)
+            if self._by_id.get(card["id"]) != card:
+                self._add(self.path.name, card)
+                changed = True
+            self._seq = seq
+        count = self._conn.execute("SELECT COUNT(*) FROM cartillas").fetchone()[0]
+        if count != len(self._by_id):
+            live = {r[0] for r in self._conn.execute("SELECT id FROM cartillas")}
+            for cid in [cid for cid in self._by_id if cid not in live]:
+                self._drop(cid)
+                changed = True
+        return changed
+
+    def refresh(self, force: bool = False) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._checked_at < self.check_interval:
+                return
+            self._checked_at = now
+            data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            if not force and data_version == self._data_version:
+                return
+            self._data_version = data_version
+            if self._pull():
+                self._changed()
+
+    def _insert(self, cards: list):
+        first = None
+        try:
+            with db_transaction(self._conn):
+                for card in cards:
+                    row = self._row(card)
+                    self._conn.execute("DELETE FROM cartillas WHERE id = ?", (card["id"],))
+                    cur = self._conn.execute(
+                        "INSERT INTO cartillas (id, voucher_code, created, fingerprint, data)"
+                        " VALUES (?, ?, ?, ?, ?)", row)
+                    first = first or cur.lastrowid
+                    last  = cur.lastrowid
+        except sqlite3.IntegrityError:
+            # Fingerprint stored by another process since our last refresh
+            self.refresh(force=True)
+            self._check_unique(cards)
+            raise
+        if first == self._seq + 1:
+            self._seq = last     # no foreign rows in between: nothing to read back
+        for card in cards:
+            self._add(self.path.name, card)
+        self._changed()
+
+    def put(self, data: dict) -> None:
+        """Persist one cartilla. Raises DuplicateGridError if another card has its numbers."""
+        self.refresh()
+        with self._lock:
+            self._check_unique([data])
+            self._insert([data])
+
+    def put_many(self, cards: list) -> str:
+        """Persist a batch in one transaction; all or nothing like the JSON store."""
+        self.refresh()
+        with self._lock:
+            self._check_unique(cards)
+            self._insert(cards)
+        return self.path.name
+
+    def delete_many(self, cids) -> int:
+        count = 0
+        with self._lock, db_transaction(self._conn):
+            for cid in cids:
+                if self._conn.execute("DELETE FROM cartillas WHERE id = ?", (cid,)).rowcount:
+                    count += 1
+                    if cid in self._by_id:
+                        self._drop(cid)
+            if count:
+                self._changed()
+        return count
+
+    def clear(self) -> int:
+        with self._lock:
+            count = self._conn.execute("DELETE FROM cartillas").rowcount
+            self._by_id.clear()
+            self._source.clear()
+            self._by_fp.clear()
+            self._changed()
+        return count
+
+def migrate_json_storage(directory: Path = CARTILLAS_DIR, path: Path = DB_PATH) -> dict:
+    """One-shot import of the JSON data (cartillas + _vouchers.json) into SQLite.
+
+    Recorded in the `meta` table, so it runs once per database even with
+    several workers starting together. JSON files are left in place as a
+    backup. Cards whose id or numbers already exist are skipped.
+    """
+    conn = open_db(path)
+    try:
+        with db_transaction(conn):
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'json_migrated'").fetchone():
+                return {"cartillas": 0, "vouchers": 0, "skipped": 0}
+            source = CartillaStore(directory)
+            source.refresh(force=True)
+            cards = source.all()
+            added = 0
+            for card in cards:
+                added += conn.execute(
+                    "INSERT OR IGNORE INTO cartillas (id, voucher_code, created, fingerprint, data)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (card["id"], card.get("voucher_code", ""), card.get("created", ""),
+                     card["fingerprint"], json.dumps(card, ensure_ascii=False))).rowcount
+            vs = JsonVoucherStore(directory / VOUCHERS_FILE.name).list()
+            for v in vs:
+                conn.execute("INSERT OR IGNORE INTO vouchers (code, created, used, data) VALUES (?, ?, ?, ?)",
+                             (v.get("code", "").upper(), v.get("created", ""), int(bool(v.get("used"))),
+                              json.dumps(v, ensure_ascii=False)))
+            conn.execute("INSERT INTO meta (key, value) VALUES ('json_migrated', ?)",
+                         (datetime.now().isoformat(),))
+        return {"cartillas": added, "vouchers": len(vs), "skipped": len(cards) - added}
+    finally:
+        conn.close()
+
+if RENDER_WORKER:
+    cartilla_store = None
+elif STORAGE == "sqlite":
+    _migrated = migrate_json_storage()
+    if _migrated["cartillas"] or _migrated["vouchers"]:
+        print(f"[storage] imported {_migrated['cartillas']} cartillas and "
+              f"{_migrated['vouchers']} vouchers from {CARTILLAS_DIR.name}/ into {DB_PATH.name}")
+    cartilla_store = SqliteCartillaStore(DB_PATH)
+else:
+    cartilla_store = CartillaStore(CARTILLAS_DIR)
+if cartilla_store is not None:
+    cartilla_store.refresh(force=True)
+
+def new_cartilla_id(taken=()) -> str:
+    while True:
+        cid = str(uuid.uuid4())[:8].upper()
+        if cid not in cartilla_store and cid not in taken:
+            return cid
+
+def new_grid(taken_fps=()) -> list:
+    """generate_cartilla_grid(), drawn again until its numbers are not in use."""
+    while True:
+        grid = generate_cartilla_grid()
+        fp   = grid_fingerprint(grid)
+        if fp not in taken_fps and cartilla_store.owner(fp) is None:
+            return grid
+
+def new_cartilla(nombre: str, grid: list, telefono: str = '', voucher_code: str = '', taken=(),
+                 strip: str = None) -> dict:
     data = {
-        "id":      cid,
+        "id":      new_cartilla_id(taken),
         "nombre":  nombre,
         "telefono": (telefono or '').strip()[:30],
         "voucher_code": (voucher_code or '').strip().upper(),
         "grid":    grid,
+        "fingerprint": grid_fingerprint(grid),
         "created": datetime.now().isoformat(),
     }
-    (CARTILLAS_DIR / f"{cid}.json").write_text(
-        json.dumps(data, ensure_ascii=False), encoding="utf-8"
-    )
+    if strip:
+        data["strip"] = strip    # id shared by the 6 cards of one strip
+    return data
+
+def new_strip(nombre: str, telefono: str = '', voucher_code: str = '', taken=(), taken_fps=()) -> list:
+    while True:
+        grids = generate_strip()
+        fps   = [grid_fingerprint(g) for g in grids]
+        if not any(fp in taken_fps or cartilla_store.owner(fp) for fp in fps):
+            break
+    strip_id = uuid.uuid4().hex[:8].upper()
+    cards, ids = [], set()
+    for grid in grids:
+        card = new_cartilla(nombre, grid, telefono, voucher_code, taken=taken, strip=strip_id)
+        while card["id"] in ids:
+            card["id"] = new_cartilla_id(taken)
+        ids.add(card["id"])
+        cards.append(card)
+    return cards
+
+def grid_error(grid) -> str:
+    """Why `grid` is not a valid cartilla, or None: 3 rows of 9 cells holding
+    15 distinct integers, each within its column's range (None for blanks)."""
+    if not isinstance(grid, list) or len(grid) != 3 or any(not isinstance(r, list) or len(r) != 9 for r in grid):
+        return "grid invalido"
+    nums = []
+    for row in grid:
+        for ci, n in enumerate(row):
+            if n is None:
+                continue
+            if type(n) is not int or n not in COL_RANGES[ci]:
+                return f"Numero invalido en la columna {ci + 1}: {n!r}"
+            nums.append(n)
+    if len(nums) != 15:
+        return f"Se requieren 15 numeros, recibidos: {len(nums)}"
+    if len(set(nums)) != 15:
+        return "Numeros repetidos"
+    return None
+
+def save_cartilla(nombre: str, grid: list, telefono: str = '', voucher_code: str = '') -> dict:
+    data = new_cartilla(nombre, grid, telefono, voucher_code)
+    cartilla_store.put(data)
     return data
 
 def load_all_cartillas() -> list:
-    cartillas = []
-    for f in sorted(CARTILLAS_DIR.glob("*.json")):
-        if f.name.startswith("_"):
-            continue
-        try:
-            cartillas.append(json.loads(f.read_text(encoding="utf-8")))
-        except:
-            pass
-    return cartillas
+    return cartilla_store.all()
 
 def load_cartilla(cid: str):
-    f = CARTILLAS_DIR / f"{cid}.json"
-    if not f.exists():
-        return None
-    return json.loads(f.read_text(encoding="utf-8"))
+    return cartilla_store.get(cid)
 
 def check_winner(grid: list, drawn: list) -> dict:
     drawn_set = set(drawn)
@@ -255,70 +1876,353 @@ def check_winner(grid: list, drawn: list) -> dict:
             break
     return result
 
-# ─── Font helper (cross-platform) ────────────────────────────────────────────
-def _get_font(bold=False, size=16):
-    """Try to find a usable font on any OS."""
-    candidates_bold   = ["arialbd.ttf", "DejaVuSans-Bold.ttf", "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
-                         "/usr/share/fonts/truetype/liberation/LiberationSans-Bold.ttf"]
-    candidates_normal = ["arial.ttf",   "DejaVuSans.ttf",      "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
-                         "/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf"]
-    candidates = candidates_bold if bold else candidates_normal
-    for path in candidates:
+# ─── Máscaras de bits ─────────────────────────────────────────────────────────
+# Each row of a cartilla is packed as a 90-bit int (bit n-1 set for number n),
+# so a card is three ints and checking it is AND + popcount.
+_LO64 = (1 << 64) - 1
+
+def numbers_mask(nums) -> int:
+    m = 0
+    for n in nums:
+        m |= 1 << (n - 1)
+    return m
+
+def grid_masks(grid: list) -> tuple:
+    return tuple(numbers_mask(n for n in row if n is not None) for row in grid)
+
+def _popcount_u64(a):
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(a)
+    return np.unpackbits(a.view(np.uint8), axis=-1).reshape(a.shape + (64,)).sum(axis=-1)
+
+class MaskMatrix:
+    """Row masks of many cartillas packed into a (N, 3, 2) uint64 array.
+
+    Falls back to a list of Python int triples when NumPy is not installed.
+    """
+
+    def __init__(self, masks: list):
+        self.size = len(masks)
+        if np is not None:
+            words = [w for rows in masks for m in rows for w in (m & _LO64, m >> 64)]
+            self.words = np.array(words, dtype=np.uint64).reshape(self.size, 3, 2)
+        else:
+            self.masks = list(masks)
+
+    def rows_left(self, drawn_mask: int):
+        """(N, 3) count of numbers still undrawn in each row."""
+        if np is None:
+            undrawn = ~drawn_mask
+            return [[(m & undrawn).bit_count() for m in rows] for rows in self.masks]
+        d = np.array([drawn_mask & _LO64, drawn_mask >> 64], dtype=np.uint64)
+        return _popcount_u64(self.words & ~d).sum(axis=2)
+
+# ─── Motor de ganadores (índice invertido) ────────────────────────────────────
+class WinnerEngine:
+    """Incremental line/bingo detection driven by the draws.
+
+    Keeps an inverted index number -> {cid: row} over every cartilla in the
+    store plus per-row and per-card "numbers left" counters. Applying a draw
+    only touches the cards that contain that number. `sync()` reconciles the
+    engine with the store (cards added/removed) and with the game (new game_id,
+    new draws), so readers always get precomputed results.
+    """
+
+    def __init__(self, store: CartillaStore):
+        self.store   = store
+        self._lock   = threading.Lock()
+        self._slots  = [{} for _ in range(91)]   # number -> {cid: row}
+        self._cards  = {}            # cid -> cartilla dict as indexed
+        self._masks  = {}            # cid -> (row0, row1, row2) bit masks
+        self._row_totals = {}        # cid -> [n0, n1, n2]
+        self._rows_left  = {}        # cid -> [left0, left1, left2]
+        self._left   = {}            # cid -> numbers not drawn yet
+        self._drawn  = []
+        self._game_id = None
+        self._store_version = None
+        self._skipped = set()        # cids of stored cards with unusable grids (logged once)
+
+    def _index_many(self, cards: list):
+        masks, usable = [], []
+        for card in cards:
+            try:
+                rows = grid_masks(card["grid"])
+            except (TypeError, ValueError):
+                rows = None
+            if rows is None or len(rows) != 3 or any(m >> 90 for m in rows):
+                if card["id"] not in self._skipped:
+                    self._skipped.add(card["id"])
+                    print(f"[winners] cartilla {card['id']} skipped: numbers outside 1-90")
+                continue
+            masks.append(rows)
+            usable.append(card)
+        if not usable:
+            return
+        left  = MaskMatrix(masks).rows_left(numbers_mask(self._drawn))
+        cards = usable
+        for card, rows, rows_left in zip(cards, masks, left):
+            cid = card["id"]
+            for ri, m in enumerate(rows):
+                while m:
+                    low = m & -m
+                    self._slots[low.bit_length()][cid] = ri
+                    m ^= low
+            self._cards[cid]      = card
+            self._masks[cid]      = rows
+            self._row_totals[cid] = [m.bit_count() for m in rows]
+            self._rows_left[cid]  = [int(x) for x in rows_left]
+            self._left[cid]       = sum(self._rows_left[cid])
+
+    def _unindex(self, cid: str):
+        self._cards.pop(cid)
+        for m in self._masks.pop(cid):
+            while m:
+                low = m & -m
+                del self._slots[low.bit_length()][cid]
+                m ^= low
+        del self._row_totals[cid], self._rows_left[cid], self._left[cid]
+
+    def _sync_cards(self):
+        version = self.store.version
+        if version == self._store_version:
+            return
+        current = {c["id"]: c for c in self.store.all()}
+        for cid in [cid for cid, card in self._cards.items() if current.get(cid) is not card]:
+            self._unindex(cid)
+        added = [card for cid, card in current.items() if cid not in self._cards]
+        if added:
+            self._index_many(added)
+        self._store_version = version   # only once fully indexed, so a failure is retried
+
+    def _reset(self, game_id):
+        self._game_id = game_id
+        self._drawn   = []
+        for cid, totals in self._row_totals.items():
+            self._rows_left[cid] = list(totals)
+            self._left[cid]      = sum(totals)
+
+    def _apply(self, num: int) -> list:
+        self._drawn.append(num)
+        events = []
+        for cid, ri in self._slots[num].items():
+            rows = self._rows_left[cid]
+            rows[ri] -= 1
+            self._left[cid] -= 1
+            if self._left[cid] == 0:
+                events.append({"id": cid, "type": "bingo", "drawn_count": len(self._drawn)})
+            elif rows[ri] == 0 and sum(1 for r in rows if r == 0) == 1:
+                events.append({"id": cid, "type": "linea", "drawn_count": len(self._drawn)})
+        return events
+
+    def sync(self, game_id, drawn: list) -> list:
+        """Bring the engine up to date; return the events raised by new draws."""
+        with self._lock:
+            known = len(self._drawn)
+            if game_id != self._game_id or drawn[:known] != self._drawn:
+                self._reset(game_id)
+                known = 0
+            self._sync_cards()
+            events = []
+            for n in drawn[known:]:
+                events.extend(self._apply(n))
+            return events
+
+    def _result(self, cid: str) -> dict:
+        card   = self._cards[cid]
+        total  = sum(self._row_totals[cid])
+        left   = self._left[cid]
+        result = {
+            "total":     total,
+            "marked":    total - left,
+            "bingo":     left == 0,
+            "linea":     False,
+            "linea_row": None,
+        }
+        for ri, (n, l) in enumerate(zip(self._row_totals[cid], self._rows_left[cid])):
+            if n and l == 0:
+                result["linea"]     = True
+                result["linea_row"] = ri
+                break
+        result["id"]     = card["id"]
+        result["nombre"] = card["nombre"]
+        return result
+
+    def result(self, cid: str):
+        with self._lock:
+            return self._result(cid) if cid in self._cards else None
+
+    def results(self, cids=None) -> list:
+        """Results ordered by id, or for the given ids in their order."""
+        with self._lock:
+            if cids is None:
+                return [self._result(cid) for cid in sorted(self._cards)]
+            return [self._result(cid) for cid in cids if cid in self._cards]
+
+winner_engine = None if RENDER_WORKER else WinnerEngine(cartilla_store)
+
+# ─── Respuestas JSON pre-codificadas ──────────────────────────────────────────
+def json_bytes(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+class EncodedResponseCache:
+    """Encoded JSON bodies of the big list endpoints, one version per key.
+
+    The plain bytes are built on the first request after the data changes;
+    gzip / brotli variants are compressed once, on first demand. Callers pass
+    a version read *before* building, so a body is never older than its label.
+    Versions are per-process counters, so they only decide when to rebuild;
+    the ETag is a digest of the body, valid across workers and restarts.
+    """
+
+    MIN_COMPRESS = 1024          # smaller bodies go out uncompressed
+
+    def __init__(self):
+        self._lock    = threading.Lock()
+        self._entries = {}       # key -> (version, digest, {encoding: bytes})
+
+    def get(self, key: str, version, build, encoding: str = "identity") -> tuple:
+        """(body in `encoding`, digest of the plain body) for `version`."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or entry[0] != version:
+            raw   = json_bytes(build())
+            entry = (version, hashlib.sha1(raw).hexdigest()[:20], {"identity": raw})
+            with self._lock:
+                self._entries[key] = entry
+        bodies = entry[2]
+        data   = bodies.get(encoding)
+        if data is None:
+            raw  = bodies["identity"]
+            data = gzip.compress(raw, compresslevel=6) if encoding == "gzip" else brotli.compress(raw, quality=5)
+            bodies[encoding] = data
+        return data, entry[1]
+
+encoded_responses = EncodedResponseCache()
+
+def cached_json_response(key: str, version, build):
+    """Response for a cached list body, negotiating br/gzip, with ETag + 304."""
+    encoding = "identity"
+    for name in ("br", "gzip"):
+        if (name != "br" or brotli is not None) and request.accept_encodings[name]:
+            encoding = name
+            break
+    data, digest = encoded_responses.get(key, version, build)
+    if len(data) < EncodedResponseCache.MIN_COMPRESS:
+        encoding = "identity"
+    etag = f"{key}-{digest}-{encoding}"
+    if etag in request.if_none_match:
+        resp = Response(status=304)
+    else:
+        if encoding != "identity":
+            data = encoded_responses.get(key, version, build, encoding)[0]
+        resp = Response(data, mimetype="application/json")
+        if encoding != "identity":
+            resp.headers["Content-Encoding"] = encoding
+    resp.set_etag(etag)
+    resp.headers["Vary"]          = "Accept-Encoding"
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp
+
+# ─── Recursos de renderizado (fuentes, colores, QR) ──────────────────────────
+FONT_CANDIDATES = {
+    True:  ["arialbd.ttf", "DejaVuSans-Bold.ttf", "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+            "/usr/share/fonts/truetype/liberation/LiberationSans-Bold.ttf"],
+    False: ["arial.ttf",   "DejaVuSans.ttf",      "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+            "/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf"],
+}
+
+def _find_font(bold: bool):
+    """First usable font on any OS, or None for PIL's default font."""
+    for path in FONT_CANDIDATES[bold]:
         try:
-            return ImageFont.truetype(path, size)
-        except:
+            ImageFont.truetype(path, 12)
+            return path
+        except Exception:
             pass
-    return ImageFont.load_default()
+    return None
 
-# ─── PDF ──────────────────────────────────────────────────────────────────────
 GROUP_COLORS_HEX = [
     "#5dade2","#f4d03f","#f1948a","#e59866",
     "#58d68d","#a569bd","#48c9b0","#7fb3d3","#95a5a6",
 ]
+GROUP_RGB = [
+    (93,173,226),(244,208,63),(241,148,138),(229,152,102),
+    (88,214,141),(165,105,189),(72,201,176),(127,179,211),(149,165,166),
+]
+
+COL_LABELS = ["1-9","10-19","20-29","30-39","40-49","50-59","60-69","70-79","80-90"]
 
 def hex_to_rgb01(h):
     h = h.lstrip("#")
     return tuple(int(h[i:i+2], 16) / 255 for i in (0, 2, 4))
 
-def cartilla_to_pdf(cartilla: dict, drawn: list = None) -> BytesIO:
-    drawn_set = set(drawn or [])
-    buf = BytesIO()
-    W, H = A4
-    c = rl_canvas.Canvas(buf, pagesize=A4)
-    cw, ch = W, H
-
-    c.setFillColorRGB(0.04, 0.07, 0.10)
-    c.rect(0, 0, cw, ch, fill=1, stroke=0)
-
-    c.setFillColorRGB(0, 0.85, 0.70)
-    c.setFont("Helvetica-Bold", 28)
-    c.drawCentredString(cw / 2, ch - 2.2 * cm, "BINGO PRO")
+class RenderAssets:
+    """Fonts, colour tables and QR images for the PDF/PNG exporters.
 
-    c.setFillColorRGB(0.55, 0.70, 0.80)
-    c.setFont("Helvetica", 12)
-    c.drawCentredString(cw / 2, ch - 3.0 * cm,
-                        f"Cartilla #{cartilla['id']}  —  {cartilla['nombre']}")
+    Built once at startup: the font files are probed a single time and every
+    size the layouts use is loaded up front, so rendering never walks the
+    candidate list. QR images are memoized per cartilla id (LRU of QR_MAX).
+    """
 
-    c.setFillColorRGB(0.3, 0.5, 0.6)
-    c.setFont("Helvetica", 9)
-    c.drawCentredString(cw / 2, ch - 3.6 * cm,
-                        f"Generada: {cartilla['created'][:16].replace('T', ' ')}")
+    PRELOAD = {True: (11, 26, 32), False: (11, 12, 13, 16)}   # bold -> sizes
+    QR_MAX  = 1024
 
-    grid  = cartilla["grid"]
-    col_w = (cw - 4 * cm) / 9
-    row_h = 1.8 * cm
-    x0    = 2 * cm
-    y0    = ch - 5.5 * cm
+    def __init__(self):
+        self._lock  = threading.Lock()
+        self.paths  = {bold: _find_font(bold) for bold in (True, False)}
+        self._fonts = {(bold, size): self._load(bold, size)
+                       for bold, sizes in self.PRELOAD.items() for size in sizes}
+        self._qr    = OrderedDict()
+
+        # Per-column colours: PDF as 0–1 floats, PNG as 0–255 shades of GROUP_RGB
+        self.pdf_rgb    = [hex_to_rgb01(h) for h in GROUP_COLORS_HEX]
+        self.pdf_label  = [(r * 0.3, g * 0.3, b * 0.3) for r, g, b in self.pdf_rgb]
+        self.pdf_marked = [(r * 0.5, g * 0.5, b * 0.5) for r, g, b in self.pdf_rgb]
+        self.pdf_text   = [(r * 1.2, g * 1.2, b * 1.2) for r, g, b in self.pdf_rgb]
+        self.png_label  = [(int(r * .25), int(g * .25), int(b * .25)) for r, g, b in GROUP_RGB]
+        self.png_marked = [(int(r * .45), int(g * .45), int(b * .45)) for r, g, b in GROUP_RGB]
+        self.png_text   = [(min(255, int(r * 1.1)), min(255, int(g * 1.1)), min(255, int(b * 1.1)))
+                           for r, g, b in GROUP_RGB]
+
+    def _load(self, bold: bool, size: int):
+        path = self.paths[bold]
+        return ImageFont.truetype(path, size) if path else ImageFont.load_default()
+
+    def font(self, bold=False, size=16):
+        font = self._fonts.get((bold, size))
+        if font is None:
+            font = self._fonts[bold, size] = self._load(bold, size)
+        return font
+
+    def qr(self, cid: str):
+        """QR image (PIL) encoding BINGO-<id>."""
+        with self._lock:
+            img = self._qr.get(cid)
+            if img is not None:
+                self._qr.move_to_end(cid)
+                return img
+        img = qrcode.make(f"BINGO-{cid}").get_image()
+        with self._lock:
+            self._qr[cid] = img
+            while len(self._qr) > self.QR_MAX:
+                self._qr.popitem(last=False)
+        return img
+
+render_assets = RenderAssets()
 
-    col_labels = ["1-9","10-19","20-29","30-39","40-49","50-59","60-69","70-79","80-90"]
+# ─── PDF ──────────────────────────────────────────────────────────────────────
+def _pdf_grid(c, grid: list, drawn_set: set, x0: float, y0: float, col_w: float, row_h: float):
+    """Column labels just above y0 and the 3×9 cells below them."""
+    assets = render_assets
     for ci in range(9):
-        r, g, b = hex_to_rgb01(GROUP_COLORS_HEX[ci])
         cx = x0 + ci * col_w
-        c.setFillColorRGB(r * 0.3, g * 0.3, b * 0.3)
+        c.setFillColorRGB(*assets.pdf_label[ci])
         c.roundRect(cx + 1, y0 + 2, col_w - 2, 0.7 * cm, 4, fill=1, stroke=0)
-        c.setFillColorRGB(r, g, b)
+        c.setFillColorRGB(*assets.pdf_rgb[ci])
         c.setFont("Helvetica-Bold", 7)
-        c.drawCentredString(cx + col_w / 2, y0 + 0.2 * cm + 2, col_labels[ci])
+        c.drawCentredString(cx + col_w / 2, y0 + 0.2 * cm + 2, COL_LABELS[ci])
 
     y0 -= 0.8 * cm
 
@@ -327,14 +2231,13 @@ def cartilla_to_pdf(cartilla: dict, drawn: list = None) -> BytesIO:
             num     = grid[ri][ci]
             cx      = x0 + ci * col_w
             cy      = y0 - ri * row_h
-            r2,g2,b2 = hex_to_rgb01(GROUP_COLORS_HEX[ci])
 
             if num is None:
                 c.setFillColorRGB(0.07, 0.12, 0.16)
                 c.setStrokeColorRGB(0.10, 0.18, 0.24)
             elif num in drawn_set:
-                c.setFillColorRGB(r2 * 0.5, g2 * 0.5, b2 * 0.5)
-                c.setStrokeColorRGB(r2, g2, b2)
+                c.setFillColorRGB(*assets.pdf_marked[ci])
+                c.setStrokeColorRGB(*assets.pdf_rgb[ci])
             else:
                 c.setFillColorRGB(0.07, 0.16, 0.22)
                 c.setStrokeColorRGB(0.15, 0.28, 0.38)
@@ -343,22 +2246,42 @@ def cartilla_to_pdf(cartilla: dict, drawn: list = None) -> BytesIO:
 
             if num is not None:
                 if num in drawn_set:
-                    c.setFillColorRGB(r2, g2, b2)
+                    c.setFillColorRGB(*assets.pdf_rgb[ci])
                     r_circ = min(col_w, row_h) * 0.36
                     c.circle(cx + col_w / 2, cy - row_h / 2 + 2, r_circ, fill=1, stroke=0)
                     c.setFillColorRGB(0.04, 0.07, 0.10)
                 else:
-                    c.setFillColorRGB(r2 * 1.2, g2 * 1.2, b2 * 1.2)
+                    c.setFillColorRGB(*assets.pdf_text[ci])
                 c.setFont("Helvetica-Bold", 18)
                 c.drawCentredString(cx + col_w / 2, cy - row_h / 2 - 5, str(num))
 
+def _pdf_page(c, cartilla: dict, drawn_set: set):
+    """One cartilla on a whole A4 page (the single-card download)."""
+    cw, ch = A4
+
+    c.setFillColorRGB(0.04, 0.07, 0.10)
+    c.rect(0, 0, cw, ch, fill=1, stroke=0)
+
+    c.setFillColorRGB(0, 0.85, 0.70)
+    c.setFont("Helvetica-Bold", 28)
+    c.drawCentredString(cw / 2, ch - 2.2 * cm, "BINGO PRO")
+
+    c.setFillColorRGB(0.55, 0.70, 0.80)
+    c.setFont("Helvetica", 12)
+    c.drawCentredString(cw / 2, ch - 3.0 * cm,
+                        f"Cartilla #{cartilla['id']}  —  {cartilla['nombre']}")
+
+    c.setFillColorRGB(0.3, 0.5, 0.6)
+    c.setFont("Helvetica", 9)
+    c.drawCentredString(cw / 2, ch - 3.6 * cm,
+                        f"Generada: {cartilla['created'][:16].replace('T', ' ')}")
+
+    grid = cartilla["grid"]
+    _pdf_grid(c, grid, drawn_set, 2 * cm, ch - 5.5 * cm, (cw - 4 * cm) / 9, 1.8 * cm)
+
     # QR
-    qr     = qrcode.make(f"BINGO-{cartilla['id']}")
-    qr_buf = BytesIO()
-    qr.save(qr_buf, format="PNG")
-    qr_buf.seek(0)
     qr_size = 2.5 * cm
-    c.drawImage(qr_buf, cw - 3 * cm, 1.5 * cm,
+    c.drawImage(ImageReader(render_assets.qr(cartilla["id"])), cw - 3 * cm, 1.5 * cm,
                 width=qr_size, height=qr_size,
                 preserveAspectRatio=True, mask='auto')
     c.setFillColorRGB(0.3, 0.5, 0.6)
@@ -371,69 +2294,167 @@ def cartilla_to_pdf(cartilla: dict, drawn: list = None) -> BytesIO:
     c.drawCentredString(cw / 2, 2.0 * cm, "Made by Renso Ramirez  •  Bingo Pro Web v4.0")
     c.drawCentredString(cw / 2, 1.4 * cm, f"Numeros marcados: {marked_count} / 15")
 
+# Compact card for several per page: drawn at this size, then scaled to its slot
+PDF_BLOCK_W, PDF_BLOCK_H = 21 * cm, 8.8 * cm
+PDF_MARGIN       = 0.8 * cm
+PDF_PER_PAGE_MAX = 14           # two columns of seven
+
+def _pdf_block(c, cartilla: dict, drawn_set: set):
+    W, H = PDF_BLOCK_W, PDF_BLOCK_H
+    c.setFillColorRGB(0.05, 0.09, 0.13)
+    c.setStrokeColorRGB(0.15, 0.28, 0.38)
+    c.roundRect(0, 0, W, H, 10, fill=1, stroke=1)
+
+    c.setFillColorRGB(0, 0.85, 0.70)
+    c.setFont("Helvetica-Bold", 18)
+    c.drawString(0.6 * cm, H - 1.1 * cm, "BINGO PRO")
+    c.setFillColorRGB(0.55, 0.70, 0.80)
+    c.setFont("Helvetica", 12)
+    c.drawRightString(17.6 * cm, H - 1.1 * cm,
+                      f"Cartilla #{cartilla['id']}  —  {cartilla['nombre'][:40]}")
+
+    grid = cartilla["grid"]
+    _pdf_grid(c, grid, drawn_set, 0.6 * cm, H - 2.2 * cm, 17 * cm / 9, 1.8 * cm)
+
+    qr_size = 2.5 * cm
+    qx, qy  = 17.9 * cm, 1.85 * cm
+    c.drawImage(ImageReader(render_assets.qr(cartilla["id"])), qx, qy,
+                width=qr_size, height=qr_size,
+                preserveAspectRatio=True, mask='auto')
+    c.setFillColorRGB(0.3, 0.5, 0.6)
+    c.setFont("Helvetica", 7)
+    c.drawCentredString(qx + qr_size / 2, qy - 0.35 * cm, f"ID: {cartilla['id']}")
+    marked_count = len([n for row in grid for n in row if n and n in drawn_set])
+    c.drawCentredString(qx + qr_size / 2, qy + qr_size + 0.3 * cm, f"Marcados: {marked_count} / 15")
+
+def cartilla_to_pdf(cartilla: dict, drawn: list = None) -> BytesIO:
+    buf = BytesIO()
+    c = rl_canvas.Canvas(buf, pagesize=A4)
+    _pdf_page(c, cartilla, set(drawn or []))
     c.save()
     buf.seek(0)
     return buf
 
+def cartillas_to_pdf(cartillas: list, drawn: list = None, per_page: int = 1) -> bytes:
+    """Several cartillas in one PDF, `per_page` to an A4 page (1 = the full-page layout).
+
+    Runs in the render pool for batch exports, so it takes and returns plain data.
+    """
+    drawn_set = set(drawn or [])
+    buf = BytesIO()
+    c = rl_canvas.Canvas(buf, pagesize=A4)
+    if per_page <= 1:
+        for card in cartillas:
+            _pdf_page(c, card, drawn_set)
+            c.showPage()
+    else:
+        W, H  = A4
+        cols  = 1 if per_page <= 3 else 2
+        rows  = -(-per_page // cols)
+        box_w = (W - 2 * PDF_MARGIN) / cols
+        box_h = (H - 2 * PDF_MARGIN) / rows
+        scale = min(box_w / PDF_BLOCK_W, box_h / PDF_BLOCK_H)
+        for start in range(0, len(cartillas), per_page):
+            c.setFillColorRGB(0.04, 0.07, 0.10)
+            c.rect(0, 0, W, H, fill=1, stroke=0)
+            for i, card in enumerate(cartillas[start:start + per_page]):
+                row, col = divmod(i, cols)
+                c.saveState()
+                c.translate(PDF_MARGIN + col * box_w + (box_w - PDF_BLOCK_W * scale) / 2,
+                            H - PDF_MARGIN - (row + 1) * box_h + (box_h - PDF_BLOCK_H * scale) / 2)
+                c.scale(scale, scale)
+                _pdf_block(c, card, drawn_set)
+                c.restoreState()
+            c.showPage()
+    c.save()
+    return buf.getvalue()
+
+# Layout of the PNG card
+PNG_COLS, PNG_ROWS = 9, 3
+PNG_PAD      = 30
+PNG_HEADER_H = 110
+PNG_FOOTER_H = 60
+PNG_CELL_W, PNG_CELL_H = 90, 80
+PNG_W = PNG_PAD * 2 + PNG_COLS * PNG_CELL_W
+PNG_H = PNG_PAD * 2 + PNG_HEADER_H + PNG_ROWS * PNG_CELL_H + PNG_FOOTER_H
+
+_png_layers      = None
+_png_layers_lock = threading.Lock()
+
+def _png_static() -> tuple:
+    """Pre-rendered parts that are the same on every card, drawn once.
+
+    (base, labels, mask): base is the background with title and credit line;
+    labels is the column-label strip, pasted through mask (the label boxes)
+    after the card's header text, which the boxes slightly overlap.
+    """
+    global _png_layers
+    with _png_layers_lock:
+        if _png_layers is None:
+            W, PAD = PNG_W, PNG_PAD
+            base = Image.new("RGB", (PNG_W, PNG_H), (10, 18, 26))
+            draw = ImageDraw.Draw(base)
+            draw.text((W // 2, PAD + 8),  "BINGO PRO",
+                      fill=(0, 210, 170), anchor="mt", font=render_assets.font(bold=True, size=32))
+            y_start = PAD + PNG_HEADER_H
+            fy      = y_start + PNG_ROWS * PNG_CELL_H + 12
+            draw.text((W // 2, fy + 24), "Made by Renso Ramirez  •  Bingo Pro Web v4.0",
+                      fill=(60, 90, 110), anchor="mt", font=render_assets.font(size=11))
+
+            labels   = base.copy()
+            mask     = Image.new("L", base.size, 0)
+            draw     = ImageDraw.Draw(labels)
+            mdraw    = ImageDraw.Draw(mask)
+            font_col = render_assets.font(bold=True, size=11)
+            for ci in range(PNG_COLS):
+                cx    = PAD + ci * PNG_CELL_W
+                box   = [cx + 3, y_start - 26, cx + PNG_CELL_W - 3, y_start - 4]
+                draw.rounded_rectangle(box, radius=6, fill=render_assets.png_label[ci])
+                mdraw.rounded_rectangle(box, radius=6, fill=255)
+                draw.text((cx + PNG_CELL_W // 2, y_start - 15), COL_LABELS[ci],
+                          fill=GROUP_RGB[ci], anchor="mm", font=font_col)
+            band = (0, y_start - 26, PNG_W, y_start - 3)
+            _png_layers = (base, labels.crop(band), mask.crop(band))
+        return _png_layers
+
 def cartilla_to_png(cartilla: dict, drawn: list = None) -> BytesIO:
     drawn_set = set(drawn or [])
     grid = cartilla["grid"]
 
-    COLS, ROWS = 9, 3
-    PAD        = 30
-    HEADER_H   = 110
-    FOOTER_H   = 60
-    CELL_W, CELL_H = 90, 80
-    W = PAD * 2 + COLS * CELL_W
-    H = PAD * 2 + HEADER_H + ROWS * CELL_H + FOOTER_H
+    COLS, ROWS = PNG_COLS, PNG_ROWS
+    PAD        = PNG_PAD
+    CELL_W, CELL_H = PNG_CELL_W, PNG_CELL_H
+    W = PNG_W
 
-    img  = Image.new("RGB", (W, H), (10, 18, 26))
+    base, labels, mask = _png_static()
+    img  = base.copy()
     draw = ImageDraw.Draw(img)
 
-    font_big   = _get_font(bold=True,  size=32)
-    font_med   = _get_font(bold=False, size=16)
-    font_small = _get_font(bold=False, size=12)
-    font_num   = _get_font(bold=True,  size=26)
-    font_col   = _get_font(bold=True,  size=11)
+    assets     = render_assets
+    font_med   = assets.font(bold=False, size=16)
+    font_small = assets.font(bold=False, size=12)
+    font_num   = assets.font(bold=True,  size=26)
 
-    draw.text((W // 2, PAD + 8),  "BINGO PRO",
-              fill=(0, 210, 170), anchor="mt", font=font_big)
     draw.text((W // 2, PAD + 50), f"Cartilla #{cartilla['id']}  —  {cartilla['nombre']}",
               fill=(140, 180, 210), anchor="mt", font=font_med)
     draw.text((W // 2, PAD + 76), f"Generada: {cartilla['created'][:16].replace('T', ' ')}",
               fill=(80, 110, 130), anchor="mt", font=font_small)
+    img.paste(labels, (0, PAD + PNG_HEADER_H - 26), mask)
 
-    GROUP_RGB = [
-        (93,173,226),(244,208,63),(241,148,138),(229,152,102),
-        (88,214,141),(165,105,189),(72,201,176),(127,179,211),(149,165,166),
-    ]
-    col_labels = ["1-9","10-19","20-29","30-39","40-49","50-59","60-69","70-79","80-90"]
-    y_start = PAD + HEADER_H
-
-    for ci in range(COLS):
-        cx    = PAD + ci * CELL_W
-        r,g,b = GROUP_RGB[ci]
-        draw.rounded_rectangle(
-            [cx + 3, y_start - 26, cx + CELL_W - 3, y_start - 4],
-            radius=6,
-            fill=(int(r * .25), int(g * .25), int(b * .25))
-        )
-        draw.text((cx + CELL_W // 2, y_start - 15), col_labels[ci],
-                  fill=(r, g, b), anchor="mm", font=font_col)
+    y_start = PAD + PNG_HEADER_H
 
     for ri in range(ROWS):
         for ci in range(COLS):
             num   = grid[ri][ci]
             cx    = PAD + ci * CELL_W
             cy    = y_start + ri * CELL_H
-            r,g,b = GROUP_RGB[ci]
 
             if num is None:
                 cell_fill   = (12, 22, 32)
                 border_fill = (20, 40, 55)
             elif num in drawn_set:
-                cell_fill   = (int(r * .45), int(g * .45), int(b * .45))
-                border_fill = (r, g, b)
+                cell_fill   = assets.png_marked[ci]
+                border_fill = GROUP_RGB[ci]
             else:
                 cell_fill   = (14, 32, 46)
                 border_fill = (30, 65, 90)
@@ -448,26 +2469,433 @@ def cartilla_to_png(cartilla: dict, drawn: list = None) -> BytesIO:
                     margin = 12
                     draw.ellipse(
                         [cx + margin, cy + margin, cx + CELL_W - margin, cy + CELL_H - margin],
-                        fill=(r, g, b)
+                        fill=GROUP_RGB[ci]
                     )
                     txt_color = (15, 25, 35)
                 else:
-                    txt_color = (min(255, int(r * 1.1)), min(255, int(g * 1.1)), min(255, int(b * 1.1)))
+                    txt_color = assets.png_text[ci]
 
                 draw.text((cx + CELL_W // 2, cy + CELL_H // 2),
                           str(num), fill=txt_color, anchor="mm", font=font_num)
 
     fy = y_start + ROWS * CELL_H + 12
     draw.text((W // 2, fy),     f"ID: {cartilla['id']}",
-              fill=(100, 150, 180), anchor="mt", font=_get_font(size=13))
-    draw.text((W // 2, fy + 24), "Made by Renso Ramirez  •  Bingo Pro Web v4.0",
-              fill=(60, 90, 110), anchor="mt", font=_get_font(size=11))
+              fill=(100, 150, 180), anchor="mt", font=assets.font(size=13))
 
     buf = BytesIO()
     img.save(buf, format="PNG", dpi=(150, 150))
     buf.seek(0)
     return buf
 
+# ─── Pool de procesos de renderizado ──────────────────────────────────────────
+class RenderBusyError(RuntimeError):
+    """Too many renders queued; the caller should retry later (HTTP 503)."""
+
+def _timed_call(fn, args):
+    """Runs in a pool worker: (seconds spent, fn(*args))."""
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - t0, result
+
+class RenderPool:
+    """Process pool for CPU-heavy renders, so they do not hold the GIL of the
+    processes serving /api/state and /api/draw.
+
+    At most `max_pending` tasks may be queued or running before new ones are
+    rejected with RenderBusyError; run() waits `timeout` seconds for a result.
+    A task stays counted until its worker really finishes it, even after the
+    caller timed out. With workers=0 everything runs in the calling thread.
+    The pool is started lazily (and again after a fork or a crashed worker)
+    with the "spawn" start method, so workers never inherit the threads and
+    open files of the server process.
+    """
+
+    def __init__(self, workers: int, max_pending: int, timeout: float):
+        self.workers     = workers
+        self.max_pending = max_pending
+        self.timeout     = timeout
+        self.pending     = 0
+        self.stats       = {"submitted": 0, "completed": 0, "rejected": 0, "timeouts": 0, "errors": 0}
+        self.busy        = 0.0           # seconds of worker time spent rendering
+        self.started_at  = time.time()
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pid  = None
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None or self._pid != os.getpid():
+                os.environ[RENDER_PARENT_ENV] = str(os.getpid())   # inherited: marks our workers
+                self._pool = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+                self._pid  = os.getpid()
+            return self._pool
+
+    def _done(self, fut):
+        with self._lock:
+            self.pending -= 1
+            if fut.cancelled():
+                return
+            if fut.exception() is not None:
+                self.stats["errors"] += 1
+                if isinstance(fut.exception(), concurrent.futures.BrokenExecutor):
+                    self._pool = None
+            else:
+                self.stats["completed"] += 1
+                self.busy += fut.result()[0]
+
+    def saturated(self) -> bool:
+        return self.pending >= self.max_pending
+
+    def submit(self, fn, *args, limit: bool = True) -> concurrent.futures.Future:
+        """Future of fn(*args) in a worker; `limit=False` skips the queue limit
+        (batch exports, which bound themselves) but still counts as load."""
+        with self._lock:
+            if limit and self.pending >= self.max_pending:
+                self.stats["rejected"] += 1
+                raise RenderBusyError("render queue full")
+            self.pending += 1
+            self.stats["submitted"] += 1
+        try:
+            inner = self._executor().submit(_timed_call, fn, args)
+        except Exception:
+            with self._lock:
+                self.pending -= 1
+                self._pool = None
+            raise
+        inner.add_done_callback(self._done)
+        outer = concurrent.futures.Future()
+
+        def relay(f):
+            if f.cancelled():
+                outer.cancel()
+            elif not outer.set_running_or_notify_cancel():
+                pass                                 # the caller gave up (timeout)
+            elif f.exception() is not None:
+                outer.set_exception(f.exception())
+            else:
+                outer.set_result(f.result()[1])
+        inner.add_done_callback(relay)
+        outer.add_done_callback(lambda f: f.cancelled() and inner.cancel())
+        return outer
+
+    def run(self, fn, *args):
+        """fn(*args) in a worker (TimeoutError after `timeout`), or inline with no workers."""
+        if not self.workers:
+            return fn(*args)
+        fut = self.submit(fn, *args)
+        try:
+            return fut.result(self.timeout)
+        except concurrent.futures.TimeoutError:
+            fut.cancel()
+            with self._lock:
+                self.stats["timeouts"] += 1
+            raise TimeoutError("render timeout")
+
+    def status(self) -> dict:
+        uptime = max(time.time() - self.started_at, 1e-9)
+        with self._lock:
+            return dict(self.stats,
+                        workers=self.workers, max_pending=self.max_pending, timeout=self.timeout,
+                        pending=self.pending,
+                        running=min(self.pending, self.workers),
+                        queued=max(0, self.pending - self.workers),
+                        utilization=round(self.busy / (uptime * self.workers), 4) if self.workers else None,
+                        avg_ms=round(self.busy / self.stats["completed"] * 1e3, 2) if self.stats["completed"] else None)
+
+RENDER_WORKERS = int(os.environ.get("RENDER_WORKERS", str(max(1, min(4, (os.cpu_count() or 2) - 1)))))
+render_pool = RenderPool(workers=RENDER_WORKERS,
+                         max_pending=int(os.environ.get("RENDER_QUEUE_MAX", str(max(1, RENDER_WORKERS) * 8))),
+                         timeout=float(os.environ.get("RENDER_TIMEOUT", "30")))
+
+def render_card(kind: str, cartilla: dict, drawn: list) -> bytes:
+    """cartilla_to_pdf / cartilla_to_png as bytes (entry point for the render pool)."""
+    return (cartilla_to_pdf if kind == "pdf" else cartilla_to_png)(cartilla, drawn).getvalue()
+
+def render_error_response(e: Exception):
+    if isinstance(e, RenderBusyError):
+        resp = jsonify({"error": "render_busy"})
+        resp.status_code = 503
+        resp.headers["Retry-After"] = "2"
+        return resp
+    if isinstance(e, TimeoutError):
+        return jsonify({"error": "render_timeout"}), 504
+    return jsonify({"error": str(e)}), 500
+
+# ─── Caché de renderizado ─────────────────────────────────────────────────────
+class RenderCache(BytesLRU):
+    """Rendered PDF/PNG files keyed by (kind, cartilla, marked numbers).
+
+    Only the card's own drawn numbers enter the key, so a ball that misses a
+    card leaves its files valid. The key also carries a stamp of the card's
+    content (numbers, name, date), so an edited card is never served stale.
+    Evicted by total bytes.
+    """
+
+    def __init__(self, max_bytes: int):
+        super().__init__(max_bytes)
+        self.hits = self.misses = 0
+
+    @staticmethod
+    def key(kind: str, cartilla: dict, drawn_mask: int) -> tuple:
+        grid  = cartilla["grid"]
+        stamp = hashlib.sha1("\n".join((json.dumps(grid), cartilla["nombre"], cartilla["created"]))
+                             .encode("utf-8")).hexdigest()[:12]
+        marked = numbers_mask(n for row in grid for n in row if n is not None) & drawn_mask
+        return (kind, cartilla["id"], stamp, marked)
+
+    @staticmethod
+    def marked(key: tuple) -> list:
+        """The drawn numbers of the card in `key` (what the renderers need)."""
+        return [n for n in range(1, 91) if key[3] >> (n - 1) & 1]
+
+    def lookup(self, kind: str, cartilla: dict, drawn_mask: int, count: bool = True):
+        """(key, cached bytes or None), counting the hit or miss unless `count` is False."""
+        key  = self.key(kind, cartilla, drawn_mask)
+        data = self.get(key)
+        if count and data is None:
+            self.misses += 1
+        elif count:
+            self.hits += 1
+        return key, data
+
+    def render(self, kind: str, cartilla: dict, drawn_mask: int):
+        """(bytes, etag) of the cartilla rendered as `kind` against the drawn numbers.
+
+        A miss renders in render_pool (RenderBusyError / TimeoutError pass through).
+        """
+        key, data = self.lookup(kind, cartilla, drawn_mask)
+        if data is None:
+            data = render_pool.run(render_card, kind, cartilla, self.marked(key))
+            self.put(key, data)
+        return data, f"{kind}-{key[1]}-{key[2]}-{key[3]:x}"
+
+    def stats(self) -> dict:
+        return {"items": len(self), "bytes": self.bytes, "max_bytes": self.max_bytes,
+                "hits": self.hits, "misses": self.misses}
+
+render_cache = RenderCache(int(float(os.environ.get("RENDER_CACHE_MB", "64")) * 1024 * 1024))
+
+def send_rendered(kind: str, cartilla: dict, cid: str):
+    """Download response for a cached render, with ETag / 304."""
+    with game_lock:
+        drawn_mask = numbers_mask(game.drawn)
+    try:
+        data, etag = render_cache.render(kind, cartilla, drawn_mask)
+    except (RenderBusyError, TimeoutError) as e:
+        return render_error_response(e)
+    name = f"cartilla_{cid}_{cartilla['nombre'].replace(' ','_')}.{kind}"
+    return send_file(BytesIO(data), mimetype="application/pdf" if kind == "pdf" else "image/png",
+                     as_attachment=True, download_name=name, etag=etag, max_age=0)
+
+# ─── Exportación por lotes (PDF) ──────────────────────────────────────────────
+class PdfStreamMerger:
+    """Joins the pages of several ReportLab PDFs into one PDF written as a stream.
+
+    Objects 1 (catalog) and 2 (page tree) are reserved and written last, so
+    each chunk goes out as soon as it is rendered: its pages and everything
+    they reference are renumbered after what was already written, and every
+    /Parent becomes 2 0 R. Only xref offsets and page numbers are kept, so
+    memory does not grow with the chunk data. Relies on ReportLab's output:
+    a plain xref table and no object streams.
+    """
+
+    HEADER = b"%PDF-1.4\n%\x93\x8c\x8b\x9e\n"
+    _REF   = re.compile(rb"(/Parent )?(\d+) 0 R")
+
+    def __init__(self):
+        self.pos     = 0
+        self.offsets = []        # offsets of objects 3, 4, ...
+        self.pages   = []        # object numbers of the pages, in order
+
+    def _emit(self, data: bytes) -> bytes:
+        self.pos += len(data)
+        return data
+
+    def header(self) -> bytes:
+        return self._emit(self.HEADER)
+
+    @staticmethod
+    def _objects(pdf: bytes):
+        """({num: (dict part, rest up to endobj)}, root num) of a ReportLab PDF."""
+        xref    = int(pdf[pdf.rindex(b"startxref") + 9:].split()[0])
+        trailer = pdf.index(b"trailer", xref)
+        lines   = pdf[xref:trailer].split(b"\n")[1:]
+        offsets, i = {}, 0
+        while i < len(lines):
+            head = lines[i].split()
+            i += 1
+            if len(head) != 2:
+                continue
+            first, count = int(head[0]), int(head[1])
+            for k in range(count):
+                entry = lines[i + k].split()
+                if entry[2] == b"n":
+                    offsets[first + k] = int(entry[0])
+            i += count
+        bounds  = sorted(offsets.values()) + [xref]
+        objects = {}
+        for num, off in offsets.items():
+            end  = bounds[bounds.index(off) + 1]
+            body = pdf[pdf.index(b"obj", off) + 3:end]
+            cut  = body.find(b"stream")
+            cut  = len(body) if cut < 0 else cut
+            objects[num] = (body[:cut], body[cut:])
+        root = int(re.search(rb"/Root (\d+) 0 R", pdf[trailer:]).group(1))
+        return objects, root
+
+    def add(self, pdf: bytes) -> bytes:
+        """Bytes to send for the pages of `pdf`."""
+        objects, root = self._objects(pdf)
+
+        def refs(num, within=b""):
+            head = objects[num][0]
+            if within:
+                head = head.split(within, 1)[1].split(b"]", 1)[0]
+            return [int(n) for parent, n in self._REF.findall(head) if not parent]
+
+        pages, tree = [], [int(re.search(rb"/Pages (\d+) 0 R", objects[root][0]).group(1))]
+        while tree:                                   # page tree, depth first
+            num = tree.pop(0)
+            if b"/Type /Pages" in objects[num][0]:
+                tree[:0] = refs(num, b"/Kids")
+            else:
+                pages.append(num)
+
+        renum, order = {}, deque(pages)
+        while order:                                  # pages first, then what they use
+            num = order.popleft()
+            if num not in renum:
+                renum[num] = 3 + len(self.offsets) + len(renum)
+                order.extend(refs(num))
+        self.pages.extend(renum[p] for p in pages)
+
+        def sub(m):
+            return b"/Parent 2 0 R" if m.group(1) else b"%d 0 R" % renum[int(m.group(2))]
+
+        out = []
+        for num, new in sorted(renum.items(), key=lambda kv: kv[1]):
+            head, rest = objects[num]
+            self.offsets.append(self.pos)
+            out.append(self._emit(b"%d 0 obj" % new + self._REF.sub(sub, head) + rest))
+        return b"".join(out)
+
+    def close(self) -> bytes:
+        """Catalog, page tree, xref and trailer."""
+        objs = [b"1 0 obj\n<< /Type /Catalog /Pages 2 0 R >>\nendobj\n",
+                b"2 0 obj\n<< /Type /Pages /Count %d /Kids [ %s ] >>\nendobj\n"
+                % (len(self.pages), b" ".join(b"%d 0 R" % p for p in self.pages))]
+        tail = []
+        first = self.pos
+        for data in objs:
+            tail.append(self._emit(data))
+        size = 3 + len(self.offsets)
+        xref = [b"xref\n0 %d\n0000000000 65535 f \n" % size,
+                b"%010d 00000 n \n" % first, b"%010d 00000 n \n" % (first + len(objs[0]))]
+        xref += [b"%010d 00000 n \n" % off for off in self.offsets]
+        xref.append(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, self.pos))
+        return b"".join(tail) + b"".join(xref)
+
+EXPORT_CHUNK = 120              # cards per pool task, rounded down to whole pages
+
+def stream_pdf_export(cards: list, drawn: list, per_page: int):
+    """Yield one PDF of `cards`: chunks render in render_pool, in order, a few ahead."""
+    size   = max(1, EXPORT_CHUNK // per_page) * per_page
+    chunks = (cards[i:i + size] for i in range(0, len(cards), size))
+    merger = PdfStreamMerger()
+    yield merger.header()
+    if not render_pool.workers:
+        for chunk in chunks:
+            yield merger.add(cartillas_to_pdf(chunk, drawn, per_page))
+    else:
+        # Exports skip the queue limit (they cannot fail halfway through) but keep
+        # at most two chunks per worker in flight, and count as pool load
+        pending = deque()
+        try:
+            for chunk in chunks:
+                pending.append(render_pool.submit(cartillas_to_pdf, chunk, drawn, per_page, limit=False))
+                if len(pending) >= 2 * render_pool.workers:
+                    yield merger.add(pending.popleft().result())
+            while pending:
+                yield merger.add(pending.popleft().result())
+        finally:
+            for f in pending:
+                f.cancel()
+    yield merger.close()
+
+# ─── Exportación por lotes (ZIP de PNG) ───────────────────────────────────────
+class _ZipSink:
+    """Write-only, unseekable file for zipfile: hands out what was written so far.
+
+    zipfile then uses data descriptors, so each entry is final once written.
+    """
+
+    def __init__(self):
+        self._parts = []
+        self._pos   = 0
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+def png_zip_name(cartilla: dict) -> str:
+    nombre = re.sub(r'[\\/:*?"<>|]+', "_", cartilla["nombre"].replace(" ", "_"))
+    return f"cartilla_{cartilla['id']}_{nombre}.png"
+
+def stream_png_zip(cards: list, drawn_mask: int):
+    """Yield a ZIP of the cards' PNGs, entry by entry as they finish.
+
+    Cached renders are written at once; the rest render in render_pool, at most
+    two per worker in flight, and are not added to the cache (an export would
+    evict the players' own downloads) nor counted in its hit/miss stats. PNGs
+    are stored, not deflated again.
+    """
+    sink    = _ZipSink()
+    stamp   = datetime.now().timetuple()[:6]
+    pending = {}                                      # future -> cartilla
+
+    with zipfile.ZipFile(sink, "w", zipfile.ZIP_STORED) as zf:
+        def write(card, data):
+            zf.writestr(zipfile.ZipInfo(png_zip_name(card), stamp), data)
+
+        def collect(block: bool):
+            done, _ = concurrent.futures.wait(pending, timeout=None if block else 0,
+                                              return_when=concurrent.futures.FIRST_COMPLETED)
+            for fut in done:
+                write(pending.pop(fut), fut.result())
+
+        try:
+            for card in cards:
+                key, data = render_cache.lookup("png", card, drawn_mask, count=False)
+                if data is not None:
+                    write(card, data)
+                elif not render_pool.workers:
+                    write(card, render_card("png", card, render_cache.marked(key)))
+                else:
+                    fut = render_pool.submit(render_card, "png", card, render_cache.marked(key), limit=False)
+                    pending[fut] = card
+                    collect(block=len(pending) >= 2 * render_pool.workers)
+                yield sink.drain()
+            while pending:
+                collect(block=True)
+                yield sink.drain()
+        finally:
+            for fut in pending:
+                fut.cancel()
+    yield sink.drain()
+
 # ─── Páginas ──────────────────────────────────────────────────────────────────
 @app.route("/")
 def index():
@@ -517,8 +2945,9 @@ def api_admin_login():
 @app.route("/api/admin/logout", methods=["POST"])
 def api_admin_logout():
     session.clear()
-    with game_lock:
+    with game_lock.write():
         game.reset()
+    publish_state("reset")
     return jsonify({"status": "ok", "game_reset": True})
 
 @app.route("/api/auth/status")
@@ -532,30 +2961,21 @@ def api_draw():
     chk = admin_required()
     if chk: return chk
 
-    with game_lock:
+    with game_lock.write():
         if not game.available:
             return jsonify({"status": "finished", "drawn": game.drawn})
         if getattr(game, 'paused', False):
             return jsonify({"status": "paused", "winners": getattr(game, 'winners_log', []), "drawn": game.drawn}), 200
-        num   = game.draw()
-        words = num2words(num, lang="es")
-        count = len(game.drawn)
-
-        if count == 1:
-            phrase = f"Primera bolilla, número {words}"
-        elif count == 90:
-            phrase = f"Última bolilla, número {words}. Juego completo!"
-        else:
-            phrase = f"La siguiente bolilla es el número {words}"
-
-        game.last_phrase   = phrase
-        game.last_activity = time.time()
+        num    = game.draw()
+        words  = num2words(num, lang="es")
+        count  = len(game.drawn)
+        phrase = draw_phrase(num, count)
 
         # Auto-pause if winners limit reached
         winners_count = len(getattr(game, 'claimed_winners', set()))
         winners_limit = getattr(game, 'winners_limit', 1)
-        if winners_count >= winners_limit and not getattr(game, 'paused', False):
-            game.paused = True
+        paused = winners_count >= winners_limit or getattr(game, 'paused', False)
+        game.set(last_phrase=phrase, last_activity=time.time(), paused=paused)
         result = {
             "status":    "ok",
             "number":    num,
@@ -565,29 +2985,64 @@ def api_draw():
             "remaining": len(game.available),
             "count":     count,
         }
+        game_id   = game.game_id
+        drawn_now = list(game.drawn)
+
+    try:
+        events = winner_engine.sync(game_id, drawn_now)
+    except Exception as e:
+        # The ball is already committed; winners are caught up on the next sync
+        print(f"[winners] sync failed: {e}")
+        events = []
+    result["lineas"] = [e["id"] for e in events if e["type"] == "linea"]
+    result["bingos"] = [e["id"] for e in events if e["type"] == "bingo"]
 
     # Read voice OUTSIDE lock (request context safe)
     try:
         voice = (request.get_json(silent=True) or {}).get("voice", "es-PE-CamilaNeural")
     except Exception:
         voice = "es-PE-CamilaNeural"
-    with game_lock:
-        game.last_voice = voice
+    with game_lock.write():
+        if voice != game.last_voice:
+            game.set(last_voice=voice)
+        paused_now = game.paused
 
+    result["audio_url"] = audio_url(result["phrase"], voice)
+    publish_state(*(("draw", "pause") if paused_now else ("draw",)))
     return jsonify(result)
     
 
-@app.route("/api/speak", methods=["POST"])
+@app.route("/api/speak", methods=["GET", "POST"])
 def api_speak():
-    data  = request.get_json() or {}
+    """POST {text, voice} or GET ?text=&voice=. The GET URL depends only on the
+    phrase, so browsers and proxies may cache it forever."""
+    if request.method == "GET":
+        data = request.args
+    else:
+        data = request.get_json() or {}
     text  = data.get("text", "")
     voice = data.get("voice", "es-MX-DaliaNeural")
     if not text:
         return jsonify({"error": "no text"}), 400
     try:
-        return send_file(make_audio(text, voice), mimetype="audio/mpeg")
+        key, audio = get_audio(text, voice)
+    except Exception as e:
+        return tts_error_response(e)
+    resp = audio_response(key, audio, immutable=request.method == "GET")
+    resp.headers["Content-Location"] = audio_url(text, voice)
+    return resp
+
+@app.route("/api/audio/<key>.mp3")
+def api_audio(key):
+    """Content-addressed audio: the key is a hash of the (voice, text) query args."""
+    text, voice = request.args.get("text", ""), request.args.get("voice", "")
+    if not text or audio_key(text, voice) != key:
+        return jsonify({"error": "not found"}), 404
+    try:
+        key, audio = get_audio(text, voice)
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return tts_error_response(e)
+    return audio_response(key, audio, immutable=True)
 
 @app.route("/api/repeat", methods=["POST"])
 def api_repeat():
@@ -600,41 +3055,109 @@ def api_repeat():
     with game_lock:
         if game.last is None:
             return jsonify({"error": "no number"}), 400
-        words  = num2words(game.last, lang="es")
-        phrase = f"Repito, bolilla número {words}"
+        phrase = repeat_phrase(game.last)
 
     try:
-        return send_file(make_audio(phrase, voice), mimetype="audio/mpeg")
+        key, audio = get_audio(phrase, voice)
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return tts_error_response(e)
+    resp = audio_response(key, audio)
+    resp.headers["Content-Location"] = audio_url(phrase, voice)
+    return resp
 
 @app.route("/api/reset", methods=["POST"])
 def api_reset():
     chk = admin_required()
     if chk: return chk
-    with game_lock:
+    with game_lock.write():
         game.reset()
+    publish_state("reset")
+    if TTS_WARMUP:
+        tts_warmup.start()   # no-op if still running; mostly cache hits after the first game
     return jsonify({"status": "ok"})
 
 @app.route("/api/state")
 def api_state():
-    with game_lock:
-        last_activity = getattr(game, 'last_activity', None)
-        admin_timeout = 300  # 5 minutes
-        admin_online  = last_activity is None or (time.time() - last_activity) < admin_timeout
-        return jsonify({
-            "drawn":         game.drawn,
-            "remaining":     len(game.available),
-            "last":          game.last,
-            "game_id":       getattr(game, 'game_id', None),
-            "last_phrase":   getattr(game, 'last_phrase', None),
-            "last_voice":    getattr(game, 'last_voice', 'es-PE-CamilaNeural'),
-            "last_activity": last_activity,
-            "admin_online":  admin_online,
-            "paused":        getattr(game, 'paused', False),
-            "winners":       getattr(game, 'winners_log', []),
-            "winners_limit": getattr(game, 'winners_limit', 1),
-        })
+    """Current game state.
+
+    Carries an ETag (304 on If-None-Match) and honours `?since=<version>` to
+    return only the draws and winners added after that version.
+    """
+    since = request.args.get("since", type=int)
+    snap  = game_lock.current()    # no game_lock: the snapshot never changes
+    etag  = snap.etag()
+    if since is None and etag in request.if_none_match:
+        resp = Response(status=304)
+    elif since is None:
+        resp = Response(snap.body(), mimetype="application/json")
+    else:
+        resp = jsonify(game_state_delta(since, snap))
+    if since is None:
+        resp.set_etag(etag)
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp
+
+@app.route("/api/state/stream")
+def api_state_stream():
+    """Server-Sent Events: pushes the state on every draw/pause/winner/reset.
+
+    Clients that cannot keep the stream open keep polling /api/state. Past
+    SSE_MAX_LISTENERS open streams in this worker the answer is 503, which
+    makes EventSource give up and the page poll instead; streams end after
+    SSE_MAX_AGE seconds so the browser reconnects (and may land elsewhere).
+    """
+    if not game_events.join(SSE_MAX_LISTENERS):
+        resp = jsonify({"error": "stream_busy"})
+        resp.status_code = 503
+        resp.headers["Retry-After"] = "60"
+        return resp
+
+    def stream(last_seq):
+        first = game_lock.current().body()
+        yield f"retry: 3000\nevent: state\ndata: {first}\n\n"
+        deadline = time.monotonic() + SSE_MAX_AGE
+        while True:
+            left = deadline - time.monotonic()
+            if left <= 0:
+                return
+            events = game_events.wait(last_seq, min(SSE_REFRESH, left))
+            if not events:
+                data = game_lock.current().body()
+                yield f"event: state\ndata: {data}\n\n"
+                continue
+            for seq, kind, data in events:
+                last_seq = seq
+                yield f"id: {seq}\nevent: {kind}\ndata: {data}\n\n"
+
+    start_shared_watcher()
+    resp = Response(stream(game_events.seq), mimetype="text/event-stream")
+    resp.call_on_close(game_events.leave)
+    resp.headers["Cache-Control"]     = "no-cache"
+    resp.headers["X-Accel-Buffering"] = "no"   # nginx: don't buffer the stream
+    return resp
+
+# ─── API Admin: TTS ───────────────────────────────────────────────────────────
+@app.route("/api/admin/tts/status")
+def api_admin_tts_status():
+    chk = admin_required()
+    if chk: return chk
+    return jsonify(tts_warmup.status())
+
+@app.route("/api/admin/tts/warmup", methods=["POST"])
+def api_admin_tts_warmup():
+    chk = admin_required()
+    if chk: return chk
+    voices  = (request.get_json(silent=True) or {}).get("voices") or None
+    started = tts_warmup.start(voices)
+    return jsonify({"status": "ok", "started": started, "warmup": tts_warmup.status()})
+
+# ─── API Admin: Render ────────────────────────────────────────────────────────
+@app.route("/api/admin/render/status")
+def api_admin_render_status():
+    """Render pool load (to size RENDER_WORKERS / RENDER_QUEUE_MAX) and cache hit rate."""
+    chk = admin_required()
+    if chk: return chk
+    return jsonify({"pool": render_pool.status(), "cache": render_cache.stats()})
 
 # ─── API Admin: Vouchers ──────────────────────────────────────────────────────
 @app.route("/api/admin/voucher", methods=["POST"])
@@ -647,41 +3170,21 @@ def api_admin_create_voucher():
     nombres   = (data.get("nombres")   or "").strip()[:60]
     apellidos = (data.get("apellidos") or "").strip()[:60]
 
-    with vouchers_lock:
-        vs   = _load_vouchers()
-        code = _gen_voucher_code()
-        while _find_voucher(vs, code):
-            code = _gen_voucher_code()
-        v = {
-            "code":      code,
-            "numero":    numero,
-            "nombres":   nombres,
-            "apellidos": apellidos,
-            "created":   datetime.now().isoformat(),
-            "used":      False,
-        }
-        vs.insert(0, v)
-        _save_vouchers(vs)
-
+    v = voucher_store.create({"numero": numero, "nombres": nombres, "apellidos": apellidos})
     return jsonify({"status": "ok", "voucher": v})
 
 @app.route("/api/admin/vouchers")
 def api_admin_list_vouchers():
     chk = admin_required()
     if chk: return chk
-    with vouchers_lock:
-        vs = _load_vouchers()
-    return jsonify({"vouchers": vs})
+    return cached_json_response("vouchers", voucher_store.version,
+                                lambda: {"vouchers": voucher_store.list()})
 
 @app.route("/api/admin/voucher/<code>/delete", methods=["DELETE"])
 def api_admin_delete_voucher(code):
     chk = admin_required()
     if chk: return chk
-    code = code.strip().upper()
-    with vouchers_lock:
-        vs = _load_vouchers()
-        vs = [v for v in vs if v.get("code", "").upper() != code]
-        _save_vouchers(vs)
+    voucher_store.delete(code.strip().upper())
     return jsonify({"status": "ok"})
 
 @app.route("/api/voucher/check", methods=["POST"])
@@ -711,22 +3214,22 @@ def api_save_manual():
         if not ok:
             return jsonify({"error": err}), 403
 
-    if not grid or len(grid) != 3 or any(len(r) != 9 for r in grid):
-        return jsonify({"error": "grid invalido"}), 400
-
-    nums = [n for row in grid for n in row if n is not None]
-    if len(nums) != 15:
-        return jsonify({"error": f"Se requieren 15 numeros, recibidos: {len(nums)}"}), 400
+    err = grid_error(grid)
+    if err:
+        return jsonify({"error": err}), 400
 
     telefono = ''
     if (not is_admin()) and code:
         vinfo = get_voucher_info(code)
         if vinfo:
             telefono = (vinfo.get('numero') or '').strip()
-    cartilla = save_cartilla(nombre, grid, telefono=telefono, voucher_code=code if (not is_admin()) else '')
+    try:
+        cartilla = save_cartilla(nombre, grid, telefono=telefono, voucher_code=code if (not is_admin()) else '')
+    except DuplicateGridError as e:
+        return jsonify({"error": "duplicate", "id": e.cid}), 409
 
-    if not is_admin() and code:
-        mark_voucher_used(code, [cartilla["id"]])
+    if not is_admin() and code and not redeem_voucher(code, [cartilla]):
+        return jsonify({"error": "used_code"}), 403
 
     return jsonify({"status": "ok", "cartilla": cartilla})
 
@@ -749,23 +3252,203 @@ def api_generate():
 
     results = []
     for _ in range(count):
-        grid     = generate_cartilla_grid()
+        grid     = new_grid()
         telefono = ''
         if (not is_admin()) and code:
             vinfo = get_voucher_info(code)
             if vinfo:
                 telefono = (vinfo.get('numero') or '').strip()
-        cartilla = save_cartilla(nombre, grid, telefono=telefono, voucher_code=code if (not is_admin()) else '')
+        try:
+            cartilla = save_cartilla(nombre, grid, telefono=telefono, voucher_code=code if (not is_admin()) else '')
+        except DuplicateGridError as e:
+            # Another request stored the same numbers meanwhile: undo this batch
+            cartilla_store.delete_many([c["id"] for c in results])
+            return jsonify({"error": "duplicate", "id": e.cid}), 409
         results.append(cartilla)
 
-    if not is_admin() and code:
-        mark_voucher_used(code, [c["id"] for c in results])
+    if not is_admin() and code and not redeem_voucher(code, results):
+        return jsonify({"error": "used_code"}), 403
 
     return jsonify({"status": "ok", "cartillas": results})
 
+@app.route("/api/cartilla/strip", methods=["POST"])
+def api_generate_strip():
+    """Issue one six-card strip (every number 1-90 exactly once) for a voucher."""
+    data   = request.get_json() or {}
+    nombre = (data.get("nombre", "") or "Jugador").strip()[:40]
+    code   = (data.get("code",   "") or "").strip().upper()
+
+    # Admin bypass — admins can generate without voucher
+    if not is_admin():
+        with game_lock:
+            if len(game.drawn) > 0:
+                return jsonify({"error": "game_started"}), 403
+
+        ok, err = validate_voucher_code(code)
+        if not ok:
+            return jsonify({"error": err}), 403
+
+    telefono = ''
+    if (not is_admin()) and code:
+        vinfo = get_voucher_info(code)
+        if vinfo:
+            telefono = (vinfo.get('numero') or '').strip()
+    cards = new_strip(nombre, telefono, code if (not is_admin()) else '')
+    try:
+        cartilla_store.put_many(cards)
+    except DuplicateGridError as e:
+        return jsonify({"error": "duplicate", "id": e.cid}), 409
+
+    if not is_admin() and code and not redeem_voucher(code, cards):
+        return jsonify({"error": "used_code"}), 403
+
+    return jsonify({"status": "ok", "strip": cards[0]["strip"], "cartillas": cards})
+
+BULK_MAX = 50000
+
+@app.route("/api/admin/cartilla/bulk", methods=["POST"])
+def api_admin_bulk_generate():
+    """Generate many cartillas in one pass and persist them with a single write.
+
+    Body: {"count": N, "nombre": "..."}, {"nombres": ["...", ...]} (one card
+    per name) or {"strips": N, "nombre": "..."} (N six-card strips covering
+    1-90 each), plus an optional voucher "code" looked up once. Streams NDJSON:
+    {"progress", "total"} lines, then a final {"status": "ok", "ids": [...]}.
+    """
+    chk = admin_required()
+    if chk: return chk
+
+    data    = request.get_json() or {}
+    strips  = int(data.get("strips") or 0)
+    nombres = [(n or "").strip()[:40] or "Jugador" for n in (data.get("nombres") or [])]
+    if strips > 0:
+        count = strips * STRIP_SIZE
+    elif nombres:
+        count = len(nombres)
+    else:
+        count = max(1, int(data.get("count", 1)))
+    if count > BULK_MAX:
+        return jsonify({"error": f"max {BULK_MAX}"}), 400
+    if not nombres or strips > 0:
+        nombre  = (data.get("nombre", "") or "Jugador").strip()[:40]
+        nombres = [nombre] * count
+
+    code     = (data.get("code") or "").strip().upper()
+    telefono = ''
+    if code:
+        ok, err = validate_voucher_code(code)
+        if not ok:
+            return jsonify({"error": err}), 400
+        telefono = (get_voucher_info(code).get('numero') or '').strip()
+
+    def stream():
+        total, cards, ids, fps = len(nombres), [], set(), set()
+        step = max(1, min(500, total // 20))
+        if strips > 0:
+            step = max(STRIP_SIZE, step - step % STRIP_SIZE)
+        while len(cards) < total:
+            if strips > 0:
+                batch = new_strip(nombres[0], telefono, code, taken=ids, taken_fps=fps)
+            else:
+                batch = [new_cartilla(nombres[len(cards)], new_grid(fps), telefono, code, taken=ids)]
+            ids.update(c["id"] for c in batch)
+            fps.update(c["fingerprint"] for c in batch)
+            cards.extend(batch)
+            if len(cards) % step == 0 or len(cards) == total:
+                yield json.dumps({"progress": len(cards), "total": total}) + "\n"
+        try:
+            segment = cartilla_store.put_many(cards)
+        except DuplicateGridError as e:
+            # Only if another request stored the same numbers meanwhile
+            yield json.dumps({"error": "duplicate", "id": e.cid}) + "\n"
+            return
+        if code and not redeem_voucher(code, cards):
+            yield json.dumps({"error": "used_code"}) + "\n"
+            return
+        yield json.dumps({"status": "ok", "count": total, "segment": segment,
+                          "ids": [c["id"] for c in cards]}) + "\n"
+
+    return Response(stream(), mimetype="application/x-ndjson",
+                    headers={"X-Accel-Buffering": "no"})
+
+# ─── Paginación / filtros de listas ───────────────────────────────────────────
+PAGE_MAX   = 1000
+LIST_PARAMS = {"limit", "cursor", "format", "q", "nombre", "voucher_code", "created_from", "created_to"}
+
+def cartilla_filter(args):
+    """Predicate for the cartilla filters in the query string, or None.
+
+    q (nombre or id contains), nombre (contains), voucher_code (exact),
+    created_from / created_to (ISO prefixes, both inclusive).
+    """
+    q       = (args.get("q")            or "").strip().lower()
+    nombre  = (args.get("nombre")       or "").strip().lower()
+    voucher = (args.get("voucher_code") or "").strip().upper()
+    c_from  = (args.get("created_from") or "").strip()
+    c_to    = (args.get("created_to")   or "").strip()
+    if not (q or nombre or voucher or c_from or c_to):
+        return None
+
+    def match(c) -> bool:
+        name    = (c.get("nombre") or "").lower()
+        created = c.get("created") or ""
+        return ((not q or q in name or q in c["id"].lower())
+                and (not nombre or nombre in name)
+                and (not voucher or (c.get("voucher_code") or "") == voucher)
+                and (not c_from or created >= c_from)
+                and (not c_to or created[:len(c_to)] <= c_to))
+    return match
+
+def select_cartillas(args) -> list:
+    """Cartillas picked by `ids` (comma-separated) and the cartilla_filter() params; all if none."""
+    cards = load_all_cartillas()
+    ids   = {x.strip().upper() for x in (args.get("ids") or "").split(",") if x.strip()}
+    if ids:
+        cards = [c for c in cards if c["id"] in ids]
+    match = cartilla_filter(args)
+    if match is not None:
+        cards = [c for c in cards if match(c)]
+    return cards
+
+def paginate(items: list, keys: list, cursor, limit):
+    """Slice of `items` (sorted by `keys`) after the `cursor` key: (page, next_key)."""
+    start = bisect.bisect_right(keys, cursor) if cursor is not None else 0
+    if limit is None:
+        return items[start:], None
+    end = start + limit
+    return items[start:end], (keys[end - 1] if end < len(items) else None)
+
+def page_limit(args):
+    limit = args.get("limit", type=int)
+    return None if limit is None else max(1, min(limit, PAGE_MAX))
+
+def ndjson_response(items):
+    """Stream one JSON object per line (exports; nothing is held but the list)."""
+    def stream():
+        for item in items:
+            yield json_bytes(item) + b"\n"
+    return Response(stream(), mimetype="application/x-ndjson",
+                    headers={"X-Accel-Buffering": "no"})
+
 @app.route("/api/cartilla/list")
 def api_list():
-    return jsonify({"cartillas": load_all_cartillas()})
+    """All cartillas (cached, compressed), or with any of `limit`, `cursor`,
+    the cartilla_filter() params or `format=ndjson`: one filtered page
+    ordered by id, {"cartillas", "total", "next_cursor"}, or an NDJSON stream.
+    """
+    cartilla_store.refresh()
+    if not LIST_PARAMS & request.args.keys():
+        return cached_json_response("list", cartilla_store.version,
+                                    lambda: {"cartillas": load_all_cartillas()})
+    cards = load_all_cartillas()
+    match = cartilla_filter(request.args)
+    if match is not None:
+        cards = [c for c in cards if match(c)]
+    page, next_cursor = paginate(cards, [c["id"] for c in cards],
+                                 request.args.get("cursor"), page_limit(request.args))
+    if request.args.get("format") == "ndjson":
+        return ndjson_response(page)
+    return jsonify({"cartillas": page, "total": len(cards), "next_cursor": next_cursor})
 
 @app.route("/api/cartilla/<cid>")
 def api_get(cid):
@@ -776,66 +3459,130 @@ def api_get(cid):
 
 @app.route("/api/cartilla/<cid>/check")
 def api_check(cid):
-    c = load_cartilla(cid.upper())
-    if not c:
-        return jsonify({"error": "not found"}), 404
     with game_lock:
-        drawn2 = list(game.drawn)
-    result = check_winner(c["grid"], drawn2)
-    result["id"]     = c["id"]
-    result["nombre"] = c["nombre"]
+        gid, drawn2 = game.game_id, list(game.drawn)
+    winner_engine.sync(gid, drawn2)
+    result = winner_engine.result(cid.upper())
+    if not result:
+        return jsonify({"error": "not found"}), 404
     return jsonify(result)
 
 @app.route("/api/cartilla/check_all")
 def api_check_all():
-    """Check all cartillas against current drawn numbers — used by admin panel."""
+    """Check all cartillas against current drawn numbers — used by admin panel.
+
+    Takes the /api/cartilla/list params plus `min_marked=k`,
+    `only=bingo|linea|prize` (linea = línea without bingo) and `sort=closest`
+    (most marked first; the cursor is then "marked:id"). Paged responses add
+    "total", "next_cursor" and a "summary" of bingos / líneas over all cards.
+    """
     with game_lock:
-        drawn2 = list(game.drawn)
+        gid, drawn2 = game.game_id, list(game.drawn)
+    cartilla_store.refresh()
+    version = f"{gid}.{len(drawn2)}.{cartilla_store.version}"
+    winner_engine.sync(gid, drawn2)
+
+    args = request.args
+    if not (LIST_PARAMS | {"min_marked", "only", "sort"}) & args.keys():
+        return cached_json_response("check_all", version, lambda: {
+            "results":     winner_engine.results(),
+            "drawn_count": len(drawn2),
+        })
 
-    cartillas = load_all_cartillas()
-    results   = []
-    for c in cartillas:
-        r         = check_winner(c["grid"], drawn2)
-        r["id"]     = c["id"]
-        r["nombre"] = c["nombre"]
-        results.append(r)
-
-    return jsonify({
-        "results":     results,
-        "drawn_count": len(drawn2),
-    })
+    match   = cartilla_filter(args)
+    results = winner_engine.results([c["id"] for c in load_all_cartillas() if match(c)]
+                                    if match is not None else None)
+    summary = {"bingos": 0, "lineas": 0}
+    for r in winner_engine.results() if match is not None else results:
+        summary["bingos"] += r["bingo"]
+        summary["lineas"] += r["linea"] and not r["bingo"]
+
+    min_marked = args.get("min_marked", type=int)
+    only       = args.get("only")
+    if min_marked is not None:
+        results = [r for r in results if r["marked"] >= min_marked]
+    if only == "bingo":
+        results = [r for r in results if r["bingo"]]
+    elif only == "linea":
+        results = [r for r in results if r["linea"] and not r["bingo"]]
+    elif only == "prize":
+        results = [r for r in results if r["linea"] or r["bingo"]]
+
+    cursor = args.get("cursor")
+    if args.get("sort") == "closest":
+        results.sort(key=lambda r: (-r["marked"], r["id"]))
+        keys = [(-r["marked"], r["id"]) for r in results]
+        if cursor is not None:
+            marked, _, cid = cursor.partition(":")
+            if not marked.isdigit():
+                return jsonify({"error": "bad cursor"}), 400
+            cursor = (-int(marked), cid)
+        page, next_key = paginate(results, keys, cursor, page_limit(args))
+        next_cursor = f"{-next_key[0]}:{next_key[1]}" if next_key else None
+    else:
+        page, next_cursor = paginate(results, [r["id"] for r in results], cursor, page_limit(args))
+
+    if args.get("format") == "ndjson":
+        return ndjson_response(page)
+    return jsonify({"results": page, "drawn_count": len(drawn2), "total": len(results),
+                    "next_cursor": next_cursor, "summary": summary})
 
 @app.route("/api/cartilla/<cid>/pdf")
 def api_pdf(cid):
     c = load_cartilla(cid.upper())
     if not c:
         return jsonify({"error": "not found"}), 404
-    with game_lock:
-        drawn2 = list(game.drawn)
-    buf  = cartilla_to_pdf(c, drawn2)
-    name = f"cartilla_{cid}_{c['nombre'].replace(' ','_')}.pdf"
-    return send_file(buf, mimetype="application/pdf",
-                     as_attachment=True, download_name=name)
+    return send_rendered("pdf", c, cid)
 
 @app.route("/api/cartilla/<cid>/png")
 def api_png(cid):
     c = load_cartilla(cid.upper())
     if not c:
         return jsonify({"error": "not found"}), 404
+    return send_rendered("png", c, cid)
+
+@app.route("/api/admin/cartilla/pdf")
+def api_admin_export_pdf():
+    """Selected cartillas (see select_cartillas()) as one PDF, streamed while
+    it renders; `per_page` cards to an A4 page (1–14, default 1)."""
+    chk = admin_required()
+    if chk: return chk
+    per_page = max(1, min(request.args.get("per_page", 1, type=int), PDF_PER_PAGE_MAX))
+    cards    = select_cartillas(request.args)
+    if not cards:
+        return jsonify({"error": "not found"}), 404
+    if render_pool.saturated():
+        return render_error_response(RenderBusyError("render queue full"))
     with game_lock:
         drawn2 = list(game.drawn)
-    buf  = cartilla_to_png(c, drawn2)
-    name = f"cartilla_{cid}_{c['nombre'].replace(' ','_')}.png"
-    return send_file(buf, mimetype="image/png",
-                     as_attachment=True, download_name=name)
+    name = f"cartillas_{datetime.now():%Y%m%d_%H%M}.pdf"
+    return Response(stream_pdf_export(cards, drawn2, per_page), mimetype="application/pdf",
+                    headers={"Content-Disposition": f'attachment; filename="{name}"',
+                             "X-Accel-Buffering": "no"})
+
+@app.route("/api/admin/cartilla/zip")
+def api_admin_export_zip():
+    """PNGs of the selected cartillas (see select_cartillas()) in one ZIP,
+    streamed entry by entry while they render."""
+    chk = admin_required()
+    if chk: return chk
+    cards = select_cartillas(request.args)
+    if not cards:
+        return jsonify({"error": "not found"}), 404
+    if render_pool.saturated():
+        return render_error_response(RenderBusyError("render queue full"))
+    with game_lock:
+        drawn_mask = numbers_mask(game.drawn)
+    name = f"cartillas_{datetime.now():%Y%m%d_%H%M}.zip"
+    return Response(stream_png_zip(cards, drawn_mask), mimetype="application/zip",
+                    headers={"Content-Disposition": f'attachment; filename="{name}"',
+                             "X-Accel-Buffering": "no"})
 
 @app.route("/api/cartilla/<cid>/delete", methods=["DELETE"])
 def api_delete_cartilla(cid):
     chk = admin_required()
     if chk: return chk
-    f = CARTILLAS_DIR / f"{cid.upper()}.json"
-    if f.exists():
-        f.unlink()
+    if cartilla_store.delete(cid.upper()):
         return jsonify({"status": "ok"})
     return jsonify({"error": "not found"}), 404
 
@@ -843,11 +3590,7 @@ def api_delete_cartilla(cid):
 def api_delete_all_cartillas():
     chk = admin_required()
     if chk: return chk
-    count = 0
-    for f in CARTILLAS_DIR.glob("*.json"):
-        if not f.name.startswith("_"):
-            f.unlink()
-            count += 1
+    count = cartilla_store.clear()
     return jsonify({"status": "ok", "deleted": count})
 
 
@@ -900,7 +3643,7 @@ def api_winner_claim():
     if not c:
         return jsonify({'error': 'not_found'}), 404
 
-    with game_lock:
+    with game_lock.write():
         drawn2  = list(game.drawn)
         gid     = getattr(game, 'game_id', None)
         claimed = getattr(game, 'claimed_winners', set())
@@ -912,14 +3655,6 @@ def api_winner_claim():
         if cid in claimed:
             return jsonify({'ok': True, 'already': True, 'game_id': gid})
 
-        claimed.add(cid)
-        game.claimed_winners = claimed
-
-        # Pause game if winners limit reached
-        winners_limit = getattr(game, 'winners_limit', 1)
-        if len(claimed) >= winners_limit:
-            game.paused = True
-
         winner = {
             'id': cid,
             'nombre': c.get('nombre'),
@@ -928,10 +3663,15 @@ def api_winner_claim():
             'drawn_count': len(drawn2),
             'game_id': gid,
         }
-        try:
-            game.winners_log.append(winner)
-        except Exception:
-            pass
+        game.add_winner(winner)
+
+        # Pause game if winners limit reached
+        winners_limit = getattr(game, 'winners_limit', 1)
+        if len(game.claimed_winners) >= winners_limit:
+            game.set(paused=True)
+        paused_now = game.paused
+
+    publish_state(*(("winner", "pause") if paused_now else ("winner",)))
 
     phone = (c.get('telefono') or '').strip()
     sms_ok = False
@@ -945,8 +3685,9 @@ def api_winner_claim():
 def api_admin_resume():
     chk = admin_required()
     if chk: return chk
-    with game_lock:
-        game.paused = False
+    with game_lock.write():
+        game.set(paused=False)
+    publish_state("resume")
     return jsonify({"status": "ok", "paused": False})
 
 @app.route("/api/admin/winners_limit", methods=["POST"])
@@ -956,12 +3697,15 @@ def api_admin_winners_limit():
     data  = request.get_json() or {}
     limit = int(data.get("limit", 1))
     limit = max(1, min(limit, 10))
-    with game_lock:
-        game.winners_limit = limit
+    with game_lock.write():
+        game.set(winners_limit=limit)
+    publish_state("state")
     return jsonify({"status": "ok", "winners_limit": limit})
 
 # ─── Main ─────────────────────────────────────────────────────────────────────
 if __name__ == "__main__":
+    if TTS_WARMUP:
+        tts_warmup.start()   # pre-render the game phrases in the background
     ip = get_local_ip()
     print("\n" + "═" * 52)
     print("  BINGO PRO WEB v4.0")
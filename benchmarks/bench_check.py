@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark: check_winner() vs bitmask checking (Python ints and NumPy).
+
+    python benchmarks/bench_check.py [--sizes 1000,10000,100000] [--drawn 45]
+"""
+
+import argparse, os, random, sys, time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("TTS_WARMUP", "0")
+
+import app
+
+
+def check_winner_masks(masks: tuple, drawn_mask: int) -> dict:
+    """Same result as check_winner(), from row masks and a mask of drawn numbers."""
+    totals = [m.bit_count() for m in masks]
+    marked = [(m & drawn_mask).bit_count() for m in masks]
+    result = {
+        "total":     sum(totals),
+        "marked":    sum(marked),
+        "bingo":     sum(marked) == sum(totals),
+        "linea":     False,
+        "linea_row": None,
+    }
+    for i, (t, k) in enumerate(zip(totals, marked)):
+        if t and t == k:
+            result["linea"]     = True
+            result["linea_row"] = i
+            break
+    return result
+
+
+def bulk_check(masks: list, drawn: list) -> list:
+    """check_winner() for many cards at once on app.MaskMatrix (vectorized with NumPy)."""
+    matrix = app.MaskMatrix(masks)
+    left   = matrix.rows_left(app.numbers_mask(drawn))
+    if app.np is None:
+        totals = [[m.bit_count() for m in rows] for rows in masks]
+    else:
+        totals, left = app._popcount_u64(matrix.words).sum(axis=2).tolist(), left.tolist()
+    results = []
+    for tot, lft in zip(totals, left):
+        linea_row = next((i for i in range(3) if tot[i] and not lft[i]), None)
+        results.append({
+            "total":     sum(tot),
+            "marked":    sum(tot) - sum(lft),
+            "bingo":     not any(lft),
+            "linea":     linea_row is not None,
+            "linea_row": linea_row,
+        })
+    return results
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return time.perf_counter() - t0, out
+
+
+def run(size: int, drawn: list):
+    grids = [app.generate_cartilla_grid() for _ in range(size)]
+
+    t_ref, ref = timed(lambda: [app.check_winner(g, drawn) for g in grids])
+
+    t_pack, masks = timed(lambda: [app.grid_masks(g) for g in grids])
+    dmask = app.numbers_mask(drawn)
+    t_int, ints = timed(lambda: [check_winner_masks(m, dmask) for m in masks])
+
+    t_build, matrix = timed(app.MaskMatrix, masks)
+    t_vec, _ = timed(matrix.rows_left, dmask)
+    t_bulk, bulk = timed(bulk_check, masks, drawn)
+
+    assert ints == ref and bulk == ref, "mask results differ from check_winner()"
+
+    print(f"{size:>8} cards | check_winner {t_ref * 1e3:9.1f} ms"
+          f" | masks (ints) {t_int * 1e3:8.1f} ms"
+          f" | bulk_check {t_bulk * 1e3:8.1f} ms"
+          f" | rows_left only {t_vec * 1e3:7.2f} ms"
+          f" | pack {t_pack * 1e3:7.1f} ms, matrix {t_build * 1e3:6.1f} ms")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", default="1000,10000,100000")
+    ap.add_argument("--drawn", type=int, default=45)
+    ap.add_argument("--seed",  type=int, default=1)
+    args = ap.parse_args()
+
+    random.seed(args.seed)
+    drawn = random.sample(range(1, 91), args.drawn)
+    print(f"NumPy: {'yes ' + app.np.__version__ if app.np is not None else 'no (pure Python ints)'}"
+          f"  ·  drawn: {len(drawn)}")
+    for size in (int(x) for x in args.sizes.split(",")):
+        run(size, drawn)
+
+
+if __name__ == "__main__":
+    main()
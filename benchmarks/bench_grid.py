@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Benchmark + uniformity check: constructive generate_cartilla_grid() vs the old
+rejection-sampling generator, plus generate_strip() throughput and validity.
+
+    python benchmarks/bench_grid.py [--cards 20000] [--strips 20000] [--seed 1]
+
+Uniformity: both generators should fill every cell with probability 5/9 and
+pick every number of a column of size m with probability (15/9)/m, and their
+row-layout distributions should match. Chi-square statistics are reported
+against a loose df + 4*sqrt(2*df) bound.
+"""
+
+import argparse, math, os, random, sys, time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("TTS_WARMUP", "0")
+
+import app
+
+
+def legacy_grid(rng):
+    """The pre-constructive generator (rejection sampling), kept for comparison."""
+    for _ in range(1000):
+        col_counts = [1] * 9
+        for e in rng.sample(range(9), 6):
+            col_counts[e] = 2
+        col_rows = [rng.sample([0, 1, 2], col_counts[c]) for c in range(9)]
+        row_counts = [0, 0, 0]
+        for c in range(9):
+            for r in col_rows[c]:
+                row_counts[r] += 1
+        if row_counts != [5, 5, 5]:
+            continue
+        grid = [[None] * 9 for _ in range(3)]
+        for c in range(9):
+            nums = sorted(rng.sample(app.COL_RANGES[c], col_counts[c]))
+            for i, r in enumerate(sorted(col_rows[c])):
+                grid[r][c] = nums[i]
+        return grid
+    raise RuntimeError("No se pudo generar cartilla válida")
+
+
+def chi2(observed, expected):
+    return sum((o - e) ** 2 / e for o, e in zip(observed, expected))
+
+
+def verdict(stat, df):
+    bound = df + 4 * math.sqrt(2 * df)
+    return f"chi2={stat:8.1f} df={df:3d} (bound {bound:6.1f}) {'OK' if stat <= bound else 'SUSPICIOUS'}"
+
+
+def stats(grids):
+    cells, numbers, layouts = Counter(), Counter(), Counter()
+    for g in grids:
+        pattern = []
+        for r in range(3):
+            for c in range(9):
+                if g[r][c] is not None:
+                    cells[r, c] += 1
+                    numbers[g[r][c]] += 1
+                    pattern.append(r * 9 + c)
+        layouts[tuple(pattern)] += 1
+    return cells, numbers, layouts
+
+
+def uniformity(name, grids):
+    n = len(grids)
+    cells, numbers, layouts = stats(grids)
+    # Each cell is a Bernoulli(5/9): use filled/empty counts per cell.
+    obs, exp = [], []
+    for r in range(3):
+        for c in range(9):
+            obs += [cells[r, c], n - cells[r, c]]
+            exp += [n * 5 / 9, n * 4 / 9]
+    print(f"  {name:12} cells   {verdict(chi2(obs, exp), 27)}")
+    obs, exp = [], []
+    for col in app.COL_RANGES:
+        for num in col:
+            obs.append(numbers[num])
+            exp.append(n * (15 / 9) / len(col))
+    print(f"  {name:12} numbers {verdict(chi2(obs, exp), 81)}")
+    return layouts
+
+
+def check_strip(strip):
+    nums = sorted(n for g in strip for row in g for n in row if n is not None)
+    assert nums == list(range(1, 91)), "strip does not cover 1-90 exactly once"
+    for g in strip:
+        assert all(sum(n is not None for n in row) == 5 for row in g), "row without 5 numbers"
+        for c in range(9):
+            col = [g[r][c] for r in range(3) if g[r][c] is not None]
+            assert 1 <= len(col) <= 2 and col == sorted(col), "bad column"
+            assert all(n in app.COL_RANGES[c] for n in col), "number in wrong column"
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--cards", type=int, default=20000)
+    ap.add_argument("--strips", type=int, default=20000)
+    ap.add_argument("--seed",  type=int, default=1)
+    args = ap.parse_args()
+
+    print(f"Speed ({args.cards} cards):")
+    rng = random.Random(args.seed)
+    t0 = time.perf_counter()
+    old = [legacy_grid(rng) for _ in range(args.cards)]
+    t_old = time.perf_counter() - t0
+
+    rng = random.Random(args.seed)
+    t0 = time.perf_counter()
+    new = [app.generate_cartilla_grid(rng) for _ in range(args.cards)]
+    t_new = time.perf_counter() - t0
+    print(f"  rejection    {t_old * 1e6 / args.cards:7.1f} µs/card")
+    print(f"  constructive {t_new * 1e6 / args.cards:7.1f} µs/card   ({t_old / t_new:.1f}x)")
+
+    print("Uniformity:")
+    old_layouts = uniformity("rejection", old)
+    new_layouts = uniformity("constructive", new)
+
+    # Two-sample test on the row layout *shape* (which rows each column uses,
+    # ignoring which columns are doubles): 3 skip-split classes x row symmetry.
+    def shape(layout):
+        rows = [0, 0, 0]
+        for cell in layout:
+            rows[cell // 9] += 1
+        cols = Counter(cell % 9 for cell in layout)
+        skips = [0, 0, 0]
+        for c, k in cols.items():
+            if k == 2:
+                used = {cell // 9 for cell in layout if cell % 9 == c}
+                skips[({0, 1, 2} - used).pop()] += 1
+        return tuple(skips)
+
+    a, b = Counter(), Counter()
+    for k, v in old_layouts.items():
+        a[shape(k)] += v
+    for k, v in new_layouts.items():
+        b[shape(k)] += v
+    keys = sorted(set(a) | set(b))
+    stat = 0.0
+    for k in keys:
+        tot = a[k] + b[k]
+        for obs, n in ((a[k], len(old)), (b[k], len(new))):
+            e = tot * n / (len(old) + len(new))
+            stat += (obs - e) ** 2 / e
+    print(f"  skip splits (rejection vs constructive) {verdict(stat, len(keys) - 1)}")
+
+    print(f"Strips ({args.strips}):")
+    rng = random.Random(args.seed)
+    t0 = time.perf_counter()
+    strips = [app.generate_strip(rng) for _ in range(args.strips)]
+    t_strip = time.perf_counter() - t0
+    for strip in strips:
+        check_strip(strip)
+    print(f"  {args.strips / t_strip:9.0f} strips/s ({t_strip * 1e6 / args.strips:.1f} µs/strip), all valid")
+
+    assert app.generate_cartilla_grid(42) == app.generate_cartilla_grid(42), "seeded mode not reproducible"
+    assert app.generate_strip(42) == app.generate_strip(42), "seeded strips not reproducible"
+    print("Seeded mode: reproducible")
+
+
+if __name__ == "__main__":
+    main()
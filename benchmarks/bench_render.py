@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-card PDF/PNG render time with per-call asset lookups (font
+probing, fresh QR, static layers redrawn) vs the RenderAssets registry, plus
+the RenderCache hit path.
+
+    python benchmarks/bench_render.py [--cards 50] [--drawn 30] [--seed 1]
+"""
+
+import argparse, os, random, sys, time
+from contextlib import contextmanager
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("TTS_WARMUP", "0")
+
+import qrcode
+from PIL import ImageFont
+
+import app
+
+
+def legacy_font(bold=False, size=16):
+    """The old _get_font(): walks the candidate list on every call."""
+    for path in app.FONT_CANDIDATES[bold]:
+        try:
+            return ImageFont.truetype(path, size)
+        except Exception:
+            pass
+    return ImageFont.load_default()
+
+
+@contextmanager
+def legacy_assets():
+    """Render as before the registry: probe fonts, rebuild QR and static layers."""
+    assets = app.render_assets
+    font, qr = assets.font, assets.qr
+    assets.font = legacy_font
+    assets.qr   = lambda cid: qrcode.make(f"BINGO-{cid}").get_image()
+    try:
+        yield
+    finally:
+        assets.font, assets.qr = font, qr
+
+
+def per_card(fn, cards, drawn, reset_layers=False):
+    t0 = time.perf_counter()
+    for card in cards:
+        if reset_layers:
+            app._png_layers = None
+        fn(card, drawn)
+    return (time.perf_counter() - t0) * 1e3 / len(cards)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--cards", type=int, default=50)
+    ap.add_argument("--drawn", type=int, default=30)
+    ap.add_argument("--seed",  type=int, default=1)
+    args = ap.parse_args()
+
+    rng   = random.Random(args.seed)
+    drawn = rng.sample(range(1, 91), args.drawn)
+    cards = [{"id": f"{i:08X}", "nombre": f"Jugador {i}", "created": "2025-01-01T12:00:00",
+              "grid": app.generate_cartilla_grid(rng)} for i in range(args.cards)]
+
+    n = 2000
+    t0 = time.perf_counter()
+    for _ in range(n):
+        legacy_font(True, 26)
+    t_probe = (time.perf_counter() - t0) * 1e6 / n
+    t0 = time.perf_counter()
+    for _ in range(n):
+        app.render_assets.font(True, 26)
+    t_reg = (time.perf_counter() - t0) * 1e6 / n
+    print(f"Font lookup: probing {t_probe:8.1f} µs   registry {t_reg:6.2f} µs")
+    print(f"Fonts resolved: bold={app.render_assets.paths[True]}  normal={app.render_assets.paths[False]}")
+
+    print(f"Per card ({args.cards} cards, {args.drawn} drawn):")
+    for kind, fn in (("png", app.cartilla_to_png), ("pdf", app.cartilla_to_pdf)):
+        fn(cards[0], drawn)                                  # warm up
+        with legacy_assets():
+            before = per_card(fn, cards, drawn, reset_layers=kind == "png")
+        after = per_card(fn, cards, drawn)
+        print(f"  {kind}  before {before:7.2f} ms   registry {after:7.2f} ms   ({before / after:.2f}x)")
+
+    mask = app.numbers_mask(drawn)
+    for card in cards:
+        app.render_cache.render("png", card, mask)
+    t0 = time.perf_counter()
+    for card in cards:
+        app.render_cache.render("png", card, mask)
+    print(f"  png  render cache hit {(time.perf_counter() - t0) * 1e3 / len(cards):7.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark: TTS warm-up and cache paths with the offline SilentSynthesizer
+backend (no network): a cold warm-up of every game phrase, the same warm-up
+again (all disk hits), and a burst of concurrent misses for one new phrase
+(one synthesis, the rest coalesced).
+
+    python benchmarks/bench_tts.py [--delay 0.01] [--voices 1] [--burst 32]
+"""
+
+import argparse, os, sys, tempfile, threading, time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("TTS_WARMUP", "0")
+
+import app
+
+
+def warmup(voices: list) -> float:
+    t0 = time.perf_counter()
+    app.tts_warmup.start(voices)
+    app.tts_warmup._thread.join()
+    return time.perf_counter() - t0
+
+
+def counters() -> str:
+    s = app.tts_stats
+    return f"hits {s['hits']:5}  misses {s['misses']:5}  coalesced {s['coalesced']:3}  errors {s['errors']}"
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--delay",  type=float, default=0.01, help="simulated synthesis latency (s)")
+    ap.add_argument("--voices", type=int,   default=1)
+    ap.add_argument("--burst",  type=int,   default=32)
+    args = ap.parse_args()
+
+    app.set_tts_backend(app.SilentSynthesizer(args.delay))
+    app.tts_cache = app.TTSDiskCache(Path(tempfile.mkdtemp(prefix="bench_tts_")), 10 ** 9, 10 ** 6)
+    voices = (app.TTS_VOICES * args.voices)[:args.voices]
+    total  = len(app.tts_game_phrases()) * len(voices)
+
+    t = warmup(voices)
+    print(f"Cold warm-up  {total:4} phrases {t:7.2f} s  ({total / t:7.1f}/s)  {counters()}")
+    t = warmup(voices)
+    print(f"Warm warm-up  {total:4} phrases {t:7.2f} s  ({total / t:7.1f}/s)  {counters()}")
+
+    before  = dict(app.tts_stats)
+    barrier = threading.Barrier(args.burst)
+
+    def player():
+        barrier.wait()
+        app.make_audio("Bolilla de prueba, noventa y uno", voices[0])
+
+    threads = [threading.Thread(target=player) for _ in range(args.burst)]
+    t0 = time.perf_counter()
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    t = time.perf_counter() - t0
+    print(f"Burst of {args.burst} requests for one new phrase {t * 1e3:7.1f} ms: "
+          f"{app.tts_stats['misses'] - before['misses']} synthesis, "
+          f"{app.tts_stats['coalesced'] - before['coalesced']} coalesced, "
+          f"{app.tts_stats['hits'] - before['hits']} hits")
+
+
+if __name__ == "__main__":
+    main()
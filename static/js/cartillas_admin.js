@@ -27,31 +27,78 @@ let allCartillas = [];
 let checkResults = {};
 let drawnNums    = [];
 let selectedNums = new Set();
+let listCursor   = null;    // next_cursor de la última página (null = no hay más)
+let listTotal    = 0;       // cartillas que coinciden con la búsqueda
+let checkActive  = false;   // tras "Verificar todas", cada página trae su verificación
+let searchTimer  = null;
+const PAGE_SIZE  = 200;
+const PAGE_MAX   = 1000;
+
+// Parámetros de página: la búsqueda se filtra en el servidor.
+function listParams(cursor, limit) {
+  const p = new URLSearchParams({ limit: limit || PAGE_SIZE });
+  const q = document.getElementById('search-input').value.trim();
+  if (q)      p.set('q', q);
+  if (cursor) p.set('cursor', cursor);
+  return p.toString();
+}
 
 // ── CARGAR CARTILLAS ──────────────────────────────
+// Recarga desde el principio tantas filas como había cargadas (refresco
+// periódico sin perder las páginas de "Cargar más").
 async function loadCartillas() {
   try {
-    const [cRes, sRes] = await Promise.all([
-      fetch('/api/cartilla/list'),
+    const limit = Math.min(PAGE_MAX, Math.max(PAGE_SIZE, allCartillas.length));
+    const [page, sRes] = await Promise.all([
+      fetchPage(null, limit),
       fetch('/api/state'),
     ]);
-    const cData = await cRes.json();
     const sData = await sRes.json();
-    allCartillas = cData.cartillas || [];
-    drawnNums    = sData.drawn     || [];
-    document.getElementById('st-drawn').textContent     = drawnNums.length;
-    document.getElementById('st-cartillas').textContent = allCartillas.length;
+    allCartillas = page.cartillas;
+    drawnNums    = sData.drawn || [];
+    document.getElementById('st-drawn').textContent = drawnNums.length;
+    if (!document.getElementById('search-input').value.trim())
+      document.getElementById('st-cartillas').textContent = listTotal;
+    renderTable(allCartillas);
+  } catch(e) {
+    showToast('❌ Error al cargar cartillas');
+  }
+}
+
+async function fetchPage(cursor, limit) {
+  const qs = listParams(cursor, limit);
+  const [cRes, kRes] = await Promise.all([
+    fetch('/api/cartilla/list?' + qs),
+    checkActive ? fetch('/api/cartilla/check_all?' + qs) : null,
+  ]);
+  const cData = await cRes.json();
+  if (kRes) ((await kRes.json()).results || []).forEach(r => { checkResults[r.id] = r; });
+  listCursor = cData.next_cursor;
+  listTotal  = cData.total;
+  return { cartillas: cData.cartillas || [] };
+}
+
+async function loadMore() {
+  if (!listCursor) return;
+  try {
+    const page = await fetchPage(listCursor);
+    allCartillas = allCartillas.concat(page.cartillas);
     renderTable(allCartillas);
   } catch(e) {
     showToast('❌ Error al cargar cartillas');
   }
 }
 
+function searchCartillas() {
+  clearTimeout(searchTimer);
+  searchTimer = setTimeout(() => { allCartillas = []; loadCartillas(); }, 300);
+}
+
 // ── RENDER TABLA ──────────────────────────────────
 function renderTable(list) {
   const tbody = document.getElementById('cartilla-tbody');
   document.getElementById('count-label').textContent =
-    `${list.length} cartilla${list.length !== 1 ? 's' : ''}`;
+    `${list.length} de ${listTotal} cartilla${listTotal !== 1 ? 's' : ''}`;
 
   if (!list.length) {
     tbody.innerHTML = `<tr><td colspan="6"
@@ -90,29 +137,34 @@ function renderTable(list) {
         </div>
       </td>
     </tr>`;
-  }).join('');
+  }).join('') + (listCursor ? `<tr><td colspan="6" style="text-align:center;padding:12px;">
+      <button class="btn btn-ghost btn-sm" onclick="loadMore()">⬇ Cargar más
+        (${listTotal - list.length} restantes)</button></td></tr>` : '');
+  filterTable();
 }
 
 // ── FILTRO ────────────────────────────────────────
+// El texto se busca en el servidor (searchCartillas); el estado se filtra
+// sobre las filas ya cargadas.
 function filterTable() {
-  const q      = document.getElementById('search-input').value.toLowerCase();
   const status = document.getElementById('filter-status').value;
+  if (status === 'all') return;
   const rows   = document.querySelectorAll('#cartilla-tbody tr[data-id]');
   let visible  = 0;
   rows.forEach(row => {
-    const matchQ = !q || row.dataset.nombre.includes(q) || row.dataset.id.toLowerCase().includes(q);
-    const matchS = status === 'all' || row.dataset.status === status;
-    row.style.display = matchQ && matchS ? '' : 'none';
-    if (matchQ && matchS) visible++;
+    const match = row.dataset.status === status;
+    row.style.display = match ? '' : 'none';
+    if (match) visible++;
   });
   document.getElementById('count-label').textContent =
-    `${visible} cartilla${visible !== 1 ? 's' : ''}`;
+    `${visible} cartilla${visible !== 1 ? 's' : ''} cargada${visible !== 1 ? 's' : ''}`;
 }
 
 // ── GENERAR AUTOMÁTICO ────────────────────────────
 async function generateCartillas() {
   const nombre = document.getElementById('inp-nombre').value.trim() || 'Jugador';
   const count  = parseInt(document.getElementById('inp-count').value) || 1;
+  if (count > 20) { await bulkGenerate({ nombre, count }); return; }
   showToast('⏳ Generando cartillas…');
   try {
     const res  = await fetch('/api/cartilla/generate', {
@@ -130,6 +182,15 @@ async function generateCartillas() {
   }
 }
 
+// ── TIRAS ─────────────────────────────────────────
+// Cada tira son 6 cartillas que juntas tienen los 90 números una sola vez;
+// la cantidad indica cuántas tiras generar.
+async function generateStrips() {
+  const nombre = document.getElementById('inp-nombre').value.trim() || 'Jugador';
+  const strips = parseInt(document.getElementById('inp-count').value) || 1;
+  await bulkGenerate({ nombre, strips });
+}
+
 // ── BATCH ─────────────────────────────────────────
 function generateBatch() {
   document.getElementById('modal-batch').classList.add('show');
@@ -142,21 +203,69 @@ async function generateBatchSubmit() {
   const names = document.getElementById('batch-names').value
     .split('\n').map(n => n.trim()).filter(Boolean);
   if (!names.length) { showToast('Escribe al menos un nombre'); return; }
-  showToast(`⏳ Generando ${names.length} cartillas…`);
   closeBatch();
-  let success = 0;
-  for (const nombre of names) {
-    try {
-      const res = await fetch('/api/cartilla/generate', {
-        method:  'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body:    JSON.stringify({ nombre, count: 1 }),
-      });
-      if (res.ok) success++;
-    } catch(e) { /* skip */ }
+  await bulkGenerate({ nombres: names });
+}
+
+// Genera muchas cartillas en una sola petición; el servidor va enviando
+// el progreso como líneas NDJSON y guarda todo el lote de una vez.
+async function bulkGenerate(payload) {
+  showToast('⏳ Generando cartillas…');
+  try {
+    const res = await fetch('/api/admin/cartilla/bulk', {
+      method:  'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body:    JSON.stringify(payload),
+    });
+    if (!res.ok) {
+      const data = await res.json().catch(() => ({}));
+      showToast('❌ ' + (data.error || 'Error al generar'));
+      return;
+    }
+    const reader  = res.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '', done = null;
+    for (;;) {
+      const { value, done: end } = await reader.read();
+      if (end) break;
+      buffer += decoder.decode(value, { stream: true });
+      const lines = buffer.split('\n');
+      buffer = lines.pop();
+      for (const line of lines) {
+        if (!line.trim()) continue;
+        const msg = JSON.parse(line);
+        if (msg.status === 'ok') done = msg;
+        else if (msg.error) { showToast('❌ ' + msg.error); return; }
+        else showToast(`⏳ Generando… ${msg.progress} / ${msg.total}`);
+      }
+    }
+    await loadCartillas();
+    showToast(done ? `✅ ${done.count} cartilla(s) generada(s)` : '❌ Error al generar');
+  } catch(e) {
+    showToast('❌ Error al generar');
   }
-  await loadCartillas();
-  showToast(`✅ ${success} cartilla(s) generada(s)`);
+}
+
+// ── EXPORTAR ──────────────────────────────────────
+// Un solo PDF con las cartillas de la búsqueda actual (todas si está vacía);
+// el servidor lo va enviando mientras lo genera.
+function exportPdf() {
+  const perPage = prompt('Cartillas por página (1–14):', '4');
+  if (perPage === null) return;
+  const p = new URLSearchParams({ per_page: parseInt(perPage, 10) || 1 });
+  const q = document.getElementById('search-input').value.trim();
+  if (q) p.set('q', q);
+  window.location.href = '/api/admin/cartilla/pdf?' + p.toString();
+  showToast('⏳ Generando PDF…');
+}
+
+// Todas las imágenes PNG de la búsqueda actual en un ZIP (para enviarlas por WhatsApp, etc.)
+function exportZip() {
+  const p = new URLSearchParams();
+  const q = document.getElementById('search-input').value.trim();
+  if (q) p.set('q', q);
+  window.location.href = '/api/admin/cartilla/zip?' + p.toString();
+  showToast('⏳ Generando ZIP…');
 }
 
 // ── ELIMINAR ──────────────────────────────────────
@@ -179,6 +288,7 @@ async function deleteAll() {
     const res = await fetch('/api/cartilla/delete_all', { method: 'DELETE' });
     if (!res.ok) { showToast('❌ No autorizado'); return; }
     checkResults = {};
+    checkActive  = false;
     await loadCartillas();
     showToast('🗑️ Todas las cartillas eliminadas');
   } catch(e) {
@@ -279,23 +389,23 @@ function closeModal() {
 }
 
 // ── VERIFICAR TODAS ───────────────────────────────
+// Pide al servidor solo las cartillas con premio y las más cercanas al bingo;
+// la verificación de cada fila llega con su página (checkActive).
 async function checkAll() {
   showToast('🔍 Verificando…');
   try {
-    const res  = await fetch('/api/cartilla/check_all');
-    const data = await res.json();
-
-    if (!res.ok) { showToast('❌ Error al verificar'); return; }
+    const [pRes, tRes] = await Promise.all([
+      fetch('/api/cartilla/check_all?only=prize&limit=1000'),
+      fetch('/api/cartilla/check_all?sort=closest&limit=5'),
+    ]);
+    const data = await pRes.json();
+    const top  = await tRes.json();
 
-    checkResults = {};
-    let bingos = 0, lineas = 0;
-    const winners = [];
+    if (!pRes.ok) { showToast('❌ Error al verificar'); return; }
 
-    (data.results || []).forEach(r => {
-      checkResults[r.id] = r;
-      if (r.bingo)      { bingos++; winners.push({...r, type:'bingo'}); }
-      else if (r.linea) { lineas++; winners.push({...r, type:'linea'}); }
-    });
+    const bingos  = data.summary.bingos;
+    const lineas  = data.summary.lineas;
+    const winners = (data.results || []).map(r => ({...r, type: r.bingo ? 'bingo' : 'linea'}));
 
     document.getElementById('st-bingos').textContent = bingos;
     document.getElementById('st-lineas').textContent = lineas;
@@ -316,11 +426,16 @@ async function checkAll() {
         </div>`
       ).join('');
     } else {
+      const close = (top.results || []).filter(r => r.marked > 0);
       wList.innerHTML = `<p style="color:var(--muted);font-size:.85rem;">
-        Ninguna cartilla tiene premio todavía. Sorteadas: ${data.drawn_count || 0}/90</p>`;
+        Ninguna cartilla tiene premio todavía. Sorteadas: ${data.drawn_count || 0}/90</p>` +
+        (close.length ? `<p style="color:var(--muted);font-size:.78rem;margin-top:6px;">Más cerca del bingo: ` +
+          close.map(r => `${escHtml(r.nombre)} #${r.id} (${r.marked}/${r.total})`).join(' · ') + `</p>` : '');
     }
 
-    renderTable(allCartillas);
+    checkActive  = true;
+    checkResults = {};
+    await loadCartillas();
     showToast(`✅ Verificado: ${bingos} bingo(s), ${lineas} línea(s)`);
   } catch(e) {
     showToast('❌ Error al verificar');
@@ -485,6 +600,7 @@ async function saveManualCartilla() {
       body:    JSON.stringify({ nombre, grid }),  // No code needed — admin bypass
     });
     const data = await res.json();
+    if (res.status === 409) { showToast(`⚠️ Ya existe una cartilla con esos números (${data.id})`); return; }
     if (!res.ok) { showToast('❌ ' + (data.error || 'Error al guardar')); return; }
     clearPicker();
     await loadCartillas();
@@ -33,16 +33,33 @@ function showToast(msg) {
 function goToGame() { location.href = '/'; }
 
 // ── CHECK JUEGO INICIADO ──────────────────────────
+let startedShown = false;
+function showStartedIfDrawn(s) {
+  if (startedShown || (s.drawn || []).length === 0) return;
+  startedShown = true;
+  document.getElementById('started-overlay').classList.add('show');
+  setTimeout(() => { location.href = '/'; }, 4000);
+}
+
 async function checkStarted() {
+  if (stateStreamOpen) return; // el stream SSE ya avisa
   try {
-    const s = await (await fetch('/api/state')).json();
-    if ((s.drawn || []).length > 0) {
-      document.getElementById('started-overlay').classList.add('show');
-      setTimeout(() => { location.href = '/'; }, 4000);
-    }
+    showStartedIfDrawn(await (await fetch('/api/state')).json());
   } catch(e) { /* silent */ }
 }
 
+// /api/state/stream avisa al instante cuando sale la primera bolilla;
+// checkStarted() queda como respaldo si el stream no está disponible.
+let stateStreamOpen = false;
+function startStateStream() {
+  if (!window.EventSource) return;
+  const es = new EventSource('/api/state/stream');
+  es.onopen  = () => { stateStreamOpen = true; };
+  es.onerror = () => { stateStreamOpen = false; };
+  ['state', 'draw'].forEach(kind =>
+    es.addEventListener(kind, e => { try { showStartedIfDrawn(JSON.parse(e.data)); } catch(err) {} }));
+}
+
 // ── TOGGLE MANUAL ─────────────────────────────────
 function toggleManual() {
   const area = document.getElementById('manual-area');
@@ -255,6 +272,7 @@ async function saveManual() {
         bad_code:     '❌ Código inválido.',
         used_code:    '⚠️ Ese código ya fue usado.',
         game_started: '⛔ El juego ya empezó.',
+        duplicate:    '⚠️ Ya existe una cartilla con esos números.',
       };
       showToast(msgs[data.error] || '❌ ' + (data.error || 'Error'));
       return;
@@ -274,4 +292,5 @@ async function saveManual() {
 buildPicker();
 loadMyCartillas();
 checkStarted();
+startStateStream();
 setInterval(checkStarted, 3000);
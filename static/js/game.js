@@ -273,11 +273,8 @@ function getVoice() {
 function speak(text, onEnd) {
   stopAudio();
   const vol = parseInt(document.getElementById('vol-slider').value) / 100;
-  fetch('/api/speak', {
-    method:  'POST',
-    headers: { 'Content-Type': 'application/json' },
-    body:    JSON.stringify({ text, voice: getVoice() })
-  })
+  // GET: la URL depende solo de la frase, así el navegador la cachea
+  fetch('/api/speak?' + new URLSearchParams({ text, voice: getVoice() }))
   .then(r => r.blob())
   .then(blob => {
     const url    = URL.createObjectURL(blob);
@@ -554,51 +551,65 @@ async function loadExistingState() {
 let playerPollJob = null;
 let lastSeenServerLast = null;
 
+let playerStream     = null;
+let playerStreamOpen = false;
+
 async function pollStateForPlayers() {
   if (IS_ADMIN) return; // solo jugadores
+  if (playerStreamOpen) return; // el stream SSE ya nos mantiene al día
 
   try {
-    const res = await fetch('/api/state', { cache: 'no-store' });
-    const data = await res.json();
+    const res = await fetch('/api/state', { cache: 'no-cache' });  // revalidates via ETag
+    applyPlayerState(await res.json());
+  } catch (e) {
+    // silencioso para no molestar
+    // console.error(e);
+  }
+}
 
-    const serverDrawn = data.drawn || [];
-    const serverLast  = data.last || null;
-
-    // primera vez: solo sincroniza (sin hablar)
-    if (lastSeenServerLast === null) {
-      drawn = serverDrawn;
-      lastNumber = serverLast;
-      serverDrawn.forEach(n => markCell(n));
-      if (serverLast) updateDisplay(serverLast, '');
-      updateRecent();
-      updateStats(serverDrawn.length, data.remaining ?? (90 - serverDrawn.length));
-      lastSeenServerLast = serverLast;
-      return;
-    }
+function applyPlayerState(data) {
+  const serverDrawn = data.drawn || [];
+  const serverLast  = data.last || null;
 
-    // si salió un nuevo número
-    if (serverLast && serverLast !== lastSeenServerLast) {
-      drawn = serverDrawn;
-      lastNumber = serverLast;
-      lastSeenServerLast = serverLast;
+  // primera vez: solo sincroniza (sin hablar)
+  if (lastSeenServerLast === null) {
+    drawn = serverDrawn;
+    lastNumber = serverLast;
+    serverDrawn.forEach(n => markCell(n));
+    if (serverLast) updateDisplay(serverLast, '');
+    updateRecent();
+    updateStats(serverDrawn.length, data.remaining ?? (90 - serverDrawn.length));
+    lastSeenServerLast = serverLast;
+    return;
+  }
 
-      // UI
-      updateDisplay(serverLast, '');
-      markCell(serverLast);
-      updateRecent();
-      updateStats(serverDrawn.length, data.remaining ?? (90 - serverDrawn.length));
+  // si salió un nuevo número
+  if (serverLast && serverLast !== lastSeenServerLast) {
+    drawn = serverDrawn;
+    lastNumber = serverLast;
+    lastSeenServerLast = serverLast;
 
-      // AUDIO: requiere unlock por click/tap
-      speak(`Bolilla ${serverLast}`);
-    }
-  } catch (e) {
-    // silencioso para no molestar
-    // console.error(e);
+    // UI
+    updateDisplay(serverLast, '');
+    markCell(serverLast);
+    updateRecent();
+    updateStats(serverDrawn.length, data.remaining ?? (90 - serverDrawn.length));
+
+    // AUDIO: requiere unlock por click/tap
+    speak(`Bolilla ${serverLast}`);
   }
 }
 
 function startPlayerPolling() {
   if (IS_ADMIN) return;
+  if (window.EventSource && !playerStream) {
+    playerStream = new EventSource('/api/state/stream');
+    playerStream.onopen  = () => { playerStreamOpen = true; };
+    playerStream.onerror = () => { playerStreamOpen = false; };
+    ['state', 'draw', 'pause', 'resume', 'winner', 'reset'].forEach(kind =>
+      playerStream.addEventListener(kind, e => applyPlayerState(JSON.parse(e.data))));
+  }
+  // Fallback: polling mientras el stream no esté abierto
   if (playerPollJob) clearInterval(playerPollJob);
   playerPollJob = setInterval(pollStateForPlayers, 1000);
 }
@@ -118,11 +118,8 @@ function playPhrase(text, voice) {
   stopAudio();
   voice = voice || 'es-PE-CamilaNeural';
 
-  fetch('/api/speak', {
-    method:  'POST',
-    headers: { 'Content-Type': 'application/json' },
-    body:    JSON.stringify({ text: text, voice: voice })
-  })
+  // GET: la URL depende solo de la frase, así el navegador la cachea
+  fetch('/api/speak?' + new URLSearchParams({ text: text, voice: voice }))
   .then(function(r) {
     if (!r.ok) throw new Error('speak HTTP ' + r.status);
     const ct = r.headers.get('content-type') || '';
@@ -166,11 +163,7 @@ function enableSound() {
   const voice = (document.getElementById('player-voice-select') || {}).value || 'es-PE-CamilaNeural';
   showToast('🔊 Probando sonido…');
 
-  fetch('/api/speak', {
-    method:  'POST',
-    headers: { 'Content-Type': 'application/json' },
-    body:    JSON.stringify({ text: 'Sonido activado. ¡Buena suerte!', voice: voice })
-  })
+  fetch('/api/speak?' + new URLSearchParams({ text: 'Sonido activado. ¡Buena suerte!', voice: voice }))
   .then(function(r) {
     if (!r.ok) throw new Error('HTTP ' + r.status);
     return r.blob();
@@ -248,95 +241,122 @@ function handleAdminOffline() {
 }
 
 // ── SYNC CON EL SERVIDOR ──────────────────────────
+// Cambios empujados por /api/state/stream (SSE). Si el stream no está abierto
+// (navegador sin EventSource, proxy que lo corta…) seguimos con el polling.
+let stateStream     = null;
+let stateStreamOpen = false;
+
+function startStateStream() {
+  if (!window.EventSource) return;
+  stateStream = new EventSource('/api/state/stream');
+  stateStream.onopen  = function() { stateStreamOpen = true; };
+  stateStream.onerror = function() {
+    stateStreamOpen = false;  // el navegador reintenta solo…
+    // …salvo si el servidor respondió 503 (lleno): polling y otro intento en un minuto
+    if (this.readyState === EventSource.CLOSED) {
+      setTimeout(startStateStream, 60000);
+    }
+  };
+  ['state', 'draw', 'pause', 'resume', 'winner', 'reset'].forEach(function(kind) {
+    stateStream.addEventListener(kind, function(e) {
+      if (resetPending) return;
+      try { applyState(JSON.parse(e.data)); } catch(err) { console.error('stream state error:', err); }
+    });
+  });
+}
+
 async function syncState() {
   if (resetPending) return; // don't sync while resetting
 
   try {
     const res  = await fetch('/api/state');
     const data = await res.json();
-    const serverDrawn  = data.drawn || [];
-    const serverGameId = data.game_id;
-
-    // Update sync badge
+    applyState(data);
+  } catch(e) {
     const statusEl = document.getElementById('sync-status');
-    if (statusEl && adminWasOnline) {
-      statusEl.innerHTML = '✅ Sincronizado';
-    }
+    if (statusEl) statusEl.innerHTML = '<span style="color:var(--warning)">⚠️ Sin conexión…</span>';
+  }
+}
 
-    // ── Admin timeout detection ──
-    // Only alert if game was in progress (avoid false positives at startup)
-    if (gameStarted && data.admin_online === false) {
-      handleAdminOffline();
-      return;
-    }
+function applyState(data) {
+  const serverDrawn  = data.drawn || [];
+  const serverGameId = data.game_id;
 
-    // ── New game ID = admin reset the game ──
-    if (gameId && serverGameId && gameId !== serverGameId && drawnLocal.length > 0) {
-      drawnLocal    = [];
-      lastLocal     = null;
-      gameStarted   = false;
-      lastPhraseKey = null;
-      elapsedSec    = 0;
-      if (clockJob) { clearInterval(clockJob); clockJob = null; }
-      stopAudio();
-      initGridReset();
-      document.getElementById('timer').textContent = '⏱ 00:00';
-      const lb = document.getElementById('last-big');
-      if (lb) { lb.textContent = '—'; lb.style.color = ''; }
-      showToast('🔄 El juego fue reiniciado por el administrador');
-    }
-    gameId = serverGameId;
+  // Update sync badge
+  const statusEl = document.getElementById('sync-status');
+  if (statusEl && adminWasOnline) {
+    statusEl.innerHTML = '✅ Sincronizado';
+  }
 
-    // No change → skip
-    if (serverDrawn.length === drawnLocal.length) return;
+  // ── Admin timeout detection ──
+  // Only alert if game was in progress (avoid false positives at startup)
+  if (gameStarted && data.admin_online === false) {
+    handleAdminOffline();
+    return;
+  }
 
-    const newNums = serverDrawn.filter(function(n) { return !drawnLocal.includes(n); });
-    drawnLocal = serverDrawn;
+  // ── New game ID = admin reset the game ──
+  if (gameId && serverGameId && gameId !== serverGameId && drawnLocal.length > 0) {
+    drawnLocal    = [];
+    lastLocal     = null;
+    gameStarted   = false;
+    lastPhraseKey = null;
+    elapsedSec    = 0;
+    if (clockJob) { clearInterval(clockJob); clockJob = null; }
+    stopAudio();
+    initGridReset();
+    document.getElementById('timer').textContent = '⏱ 00:00';
+    const lb = document.getElementById('last-big');
+    if (lb) { lb.textContent = '—'; lb.style.color = ''; }
+    showToast('🔄 El juego fue reiniciado por el administrador');
+  }
+  gameId = serverGameId;
 
-    if (serverDrawn.length > 0 && !gameStarted) {
-      gameStarted = true;
-      startClock();
-      updateStatusMsg(serverDrawn.length, data.remaining);
-    }
+  // Juego pausado por ganador (llega también sin bolilla nueva: eventos pause/winner/resume)
+  if (data.paused) {
+    showPausedOverlay(data.winners || []);
+  } else {
+    hidePausedOverlay();
+  }
 
-    // Re-mark all (recovery after page reload)
-    drawnLocal.forEach(function(n) { markCell(n, false); });
-
-    if (newNums.length > 0) {
-      const latest = newNums[newNums.length - 1];
-      markCell(latest, true);
-      updateDisplay(latest);
-      updateStatusMsg(serverDrawn.length, data.remaining);
-
-      // ── Player audio ──
-      const phrase   = data.last_phrase;
-      const pKey     = serverDrawn.length; // unique key per draw
-      if (phrase && pKey !== lastPhraseKey) {
-        lastPhraseKey = pKey;
-        // Use player's own selected voice (or fall back to admin voice)
-        const pVoice = (document.getElementById('player-voice-select') || {}).value || data.last_voice || 'es-PE-CamilaNeural';
-        playPhrase(phrase, pVoice);
-      }
-    }
+  // No change → skip
+  if (serverDrawn.length === drawnLocal.length) return;
 
-    updateRecent();
-    updateStats(serverDrawn.length, data.remaining);
-    updateMyCartillaAutoMark();
+  const newNums = serverDrawn.filter(function(n) { return !drawnLocal.includes(n); });
+  drawnLocal = serverDrawn;
 
-    // Juego pausado por ganador
-    if (data.paused) {
-      showPausedOverlay(data.winners || []);
-    } else {
-      hidePausedOverlay();
-    }
+  if (serverDrawn.length > 0 && !gameStarted) {
+    gameStarted = true;
+    startClock();
+    updateStatusMsg(serverDrawn.length, data.remaining);
+  }
 
-    if (data.remaining === 0 && serverDrawn.length === 90) {
-      showGameOver();
+  // Re-mark all (recovery after page reload)
+  drawnLocal.forEach(function(n) { markCell(n, false); });
+
+  if (newNums.length > 0) {
+    const latest = newNums[newNums.length - 1];
+    markCell(latest, true);
+    updateDisplay(latest);
+    updateStatusMsg(serverDrawn.length, data.remaining);
+
+    // ── Player audio ──
+    const phrase   = data.last_phrase;
+    const pKey     = serverDrawn.length; // unique key per draw
+    if (phrase && pKey !== lastPhraseKey) {
+      lastPhraseKey = pKey;
+      // Use player's own selected voice (or fall back to admin voice)
+      const pVoice = (document.getElementById('player-voice-select') || {}).value || data.last_voice || 'es-PE-CamilaNeural';
+      playPhrase(phrase, pVoice);
     }
+  }
 
-  } catch(e) {
-    const statusEl = document.getElementById('sync-status');
-    if (statusEl) statusEl.innerHTML = '<span style="color:var(--warning)">⚠️ Sin conexión…</span>';
+  updateRecent();
+  updateStats(serverDrawn.length, data.remaining);
+  updateMyCartillaAutoMark();
+
+  if (data.remaining === 0 && serverDrawn.length === 90) {
+    showGameOver();
   }
 }
 
@@ -712,5 +732,6 @@ document.addEventListener('DOMContentLoaded', function() {
   initMyCartillaUI();
 
   syncState();
-  setInterval(syncState, 3000);
+  startStateStream();
+  setInterval(function() { if (!stateStreamOpen) syncState(); }, 3000);
 });
\ No newline at end of file